@@ -2,14 +2,34 @@
 """
 Точка входа в приложение обработки данных hh.ru.
 Если путь не указан — ищет hh.csv в корне репозитория.
+
+Можно передать несколько файлов, glob-шаблонов или каталогов с шардами
+(в том числе .csv.gz/.csv.zst): шарды обрабатываются параллельно
+и объединяются в один x_data.npy/y_data.npy.
+
+Фильтры --min-salary/--max-salary/--developers-only применяются до разбора
+признаков, поэтому отброшенные строки не обрабатываются.
+
+--city-vocabulary задаёт JSON-словарь городов, общий для заданий №2 и №3:
+если файл есть, города кодируются по нему, иначе словарь строится по данным
+и сохраняется туда.
+
+--rates и --rates-date выбирают файл курсов валют и дату: для каждой валюты
+берётся последний курс не позже этой даты.
 """
 
 import sys
 import os
+import json
+import argparse
 import logging
 import numpy as np
 from pathlib import Path
 from pipeline import DataPipeline
+from shards import ShardedPipeline, resolve_inputs
+from handlers.predicates import DeveloperTitle, SalaryRange
+from handlers.city_encoder import CityEncoder
+from handlers.currency import CurrencyTable, DEFAULT_RATES_PATH
 
 
 logging.basicConfig(
@@ -20,6 +40,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Схема признаков (имена столбцов по порядку) для задания №2 пишется рядом
+# с матрицей: x_data.npy → x_data.features.json (правило feature_names_path
+# в assignment2_regression/model.py)
+FEATURES_SUFFIX = ".features.json"
+
 
 def find_hh_csv() -> Path | None:
     """Автоматически найти hh.csv в корне репозитория."""
@@ -35,10 +60,89 @@ def find_hh_csv() -> Path | None:
     return None
 
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Обработка выгрузки резюме hh.ru в x_data.npy и y_data.npy")
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        help="hh.csv, Parquet-файлы, glob-шаблоны или каталоги с шардами (по умолчанию — поиск hh.csv)"
+    )
+    parser.add_argument("--workers", type=int, help="Число процессов для обработки шардов (по умолчанию — число ядер)")
+    parser.add_argument("--output-dir", help="Каталог для x_data.npy и y_data.npy (по умолчанию — каталог первого файла)")
+    parser.add_argument("--min-salary", type=float, help="Оставить резюме с зарплатой не ниже (руб.)")
+    parser.add_argument("--max-salary", type=float, help="Оставить резюме с зарплатой не выше (руб.)")
+    parser.add_argument(
+        "--developers-only",
+        action="store_true",
+        help="Оставить только резюме разработчиков (по желаемой должности)"
+    )
+    parser.add_argument(
+        "--rates",
+        type=Path,
+        default=DEFAULT_RATES_PATH,
+        help="CSV-файл курсов валют (date,currency,rate_rub); по умолчанию — resources/currency_rates.csv"
+    )
+    parser.add_argument(
+        "--rates-date",
+        help="Дата курсов YYYY-MM-DD: последний курс каждой валюты не позже неё (по умолчанию — самые свежие)"
+    )
+    parser.add_argument("--city-vocabulary", help="JSON-словарь городов: загрузить, если есть, иначе построить и сохранить")
+    parser.add_argument(
+        "--city-top-k",
+        type=int,
+        default=10,
+        help="Сколько самых частых городов кодировать отдельно (0 — без ограничения)"
+    )
+    parser.add_argument("--city-min-frequency", type=int, default=1, help="Минимальная частота города для словаря")
+    parser.add_argument(
+        "--city-buckets",
+        type=int,
+        default=0,
+        help="Число корзин хеширования для городов вне словаря (0 — одна категория Other)"
+    )
+    return parser.parse_args()
+
+
+def build_predicates(args: argparse.Namespace) -> list:
+    """Собрать предикаты отбора строк по аргументам командной строки."""
+    predicates = []
+    if args.developers_only:
+        predicates.append(DeveloperTitle())
+    if args.min_salary is not None or args.max_salary is not None:
+        predicates.append(SalaryRange(args.min_salary, args.max_salary))
+    return predicates
+
+
+def city_options(args: argparse.Namespace) -> dict:
+    """Параметры кодирования городов для DataPipeline."""
+    vocabulary_path = Path(args.city_vocabulary) if args.city_vocabulary else None
+    if vocabulary_path is not None and vocabulary_path.exists():
+        encoder = CityEncoder.load(vocabulary_path)
+        logger.info(f"Словарь городов загружен из {vocabulary_path}: {len(encoder.vocabulary_)} городов")
+        return {"city_encoder": encoder}
+    return {
+        "city_top_k": args.city_top_k or None,
+        "city_min_frequency": args.city_min_frequency,
+        "city_buckets": args.city_buckets,
+    }
+
+
+def log_filter_report(pipeline: DataPipeline | ShardedPipeline) -> None:
+    """Вывести число строк, отброшенных каждой стадией отбора."""
+    report = pipeline.filter_report()
+    for name, rows_in, rows_out in report:
+        logger.info(f"{name}: {rows_in} → {rows_out} строк (отброшено {rows_in - rows_out})")
+    if report:
+        rows_read, rows_kept = report[0][1], report[-1][2]
+        logger.info(f"Признаки разобраны для {rows_kept} из {rows_read} строк")
+
+
 def main() -> None:
-    # Определяем путь к CSV
-    if len(sys.argv) == 2:
-        csv_path = Path(sys.argv[1])
+    args = parse_args()
+    
+    # Определяем входные файлы
+    if args.inputs:
+        inputs = args.inputs
     else:
         csv_path = find_hh_csv()
         if csv_path is None:
@@ -46,23 +150,64 @@ def main() -> None:
             logger.error("  python app.py путь/к/hh.csv")
             sys.exit(1)
         logger.info(f"Автоматически найден hh.csv: {csv_path}")
+        inputs = [csv_path]
+    
+    try:
+        paths = resolve_inputs(inputs)
+    except FileNotFoundError as e:
+        logger.error(f"Файл не найден: {e}")
+        sys.exit(1)
     
-    if not csv_path.exists():
-        logger.error(f"Файл не найден: {csv_path}")
+    output_dir = Path(args.output_dir) if args.output_dir else paths[0].parent
+    predicates = build_predicates(args)
+    try:
+        options = city_options(args)
+    except (OSError, ValueError) as e:
+        logger.error(f"Не удалось загрузить словарь городов: {e}")
         sys.exit(1)
+    # Курсы проверяются здесь, чтобы ошибка в файле или дате не всплыла в рабочих процессах
+    try:
+        rates = CurrencyTable.from_csv(args.rates, args.rates_date)
+    except (OSError, ValueError, KeyError) as e:
+        logger.error(f"Не удалось загрузить курсы валют: {e}")
+        sys.exit(1)
+    logger.info(f"Курсы валют из {args.rates} на {rates.as_of}")
+    options.update(rates_path=args.rates, rates_date=args.rates_date)
     
+    # Один несжатый файл — в текущем процессе, несколько шардов — пулом процессов
+    if len(paths) == 1 and paths[0].suffix.lower() in (".csv", ".parquet"):
+        pipeline = DataPipeline(predicates=predicates, **options)
+    else:
+        pipeline = ShardedPipeline(workers=args.workers, predicates=predicates, **options)
     try:
-        pipeline = DataPipeline()
-        x_data, y_data = pipeline.process(str(csv_path))
+        if isinstance(pipeline, DataPipeline):
+            x_data, y_data = pipeline.process(paths[0])
+        else:
+            x_data, y_data = pipeline.process(paths)
+        log_filter_report(pipeline)
         
-        output_dir = csv_path.parent
-        np.save(output_dir / "x_data.npy", x_data)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        x_path = output_dir / "x_data.npy"
+        np.save(x_path, x_data)
         np.save(output_dir / "y_data.npy", y_data)
+        with open(x_path.with_suffix(FEATURES_SUFFIX), "w", encoding="utf-8") as f:
+            json.dump(pipeline.feature_names, f, ensure_ascii=False, indent=2)
+        if args.city_vocabulary and "city_encoder" not in options:
+            if pipeline.city_encoder is None:
+                raise RuntimeError(
+                    f"Словарь городов не построен (города не входят в признаки?), "
+                    f"{args.city_vocabulary} не записан"
+                )
+            pipeline.city_encoder.save(args.city_vocabulary)
+            logger.info(f"Словарь городов сохранён в {args.city_vocabulary}")
         
         logger.info(f"✓ Сохранены x_data.npy ({x_data.shape}) и y_data.npy ({y_data.shape})")
     except Exception as e:
         logger.exception(f"Ошибка обработки: {e}")
         sys.exit(1)
+    finally:
+        if isinstance(pipeline, DataPipeline):
+            pipeline.close()
 
 
 if __name__ == "__main__":
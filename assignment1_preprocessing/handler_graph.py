@@ -0,0 +1,196 @@
+"""
+Граф обработчиков с планированием по зависимостям между столбцами.
+
+Обработчики объявляют читаемые (inputs) и создаваемые (outputs) столбцы;
+по этим объявлениям строится DAG. Обработчики, удаляющие строки, выполняются
+первыми и последовательно, затем независимые обработчики признаков
+выполняются параллельно (по уровням графа), а обработчики, чьи выходы не нужны
+для запрошенных столбцов, пропускаются.
+"""
+
+import os
+import fnmatch
+import logging
+import pandas as pd
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from handlers.base_handler import Handler
+
+
+logger = logging.getLogger(__name__)
+
+
+def _matches(name: str, pattern: str) -> bool:
+    """Совпадают ли имя и шаблон столбца (шаблоны допустимы с обеих сторон)."""
+    return name == pattern or fnmatch.fnmatchcase(name, pattern) or fnmatch.fnmatchcase(pattern, name)
+
+
+def _select(df: pd.DataFrame, patterns: tuple[str, ...]) -> pd.DataFrame:
+    """Выбрать столбцы DataFrame, подходящие под шаблоны."""
+    return df[[col for col in df.columns if any(fnmatch.fnmatchcase(col, p) for p in patterns)]]
+
+
+def _run_handler(handler: Handler, frame: pd.DataFrame) -> pd.DataFrame:
+    """Выполнить обработчик на узком DataFrame и вернуть только его выходы."""
+    return _select(handler.handle(frame), handler.outputs)
+
+
+class HandlerGraph:
+    """
+    DAG обработчиков, построенный по объявленным inputs/outputs.
+    
+    Обработчики одного уровня графа выполняются параллельно в пуле потоков
+    (векторные операции pandas/numpy/pyarrow отпускают GIL); пул процессов
+    используется только для обработчиков с uses_processes = True. Каждый обработчик
+    получает копию только своих входных столбцов, поэтому обработчики
+    не мешают друг другу.
+    """
+    
+    def __init__(self, handlers: list[Handler], max_workers: int | None = None) -> None:
+        """
+        Аргументы:
+            handlers: Обработчики графа (порядок важен только для фильтров строк)
+            max_workers: Размер пулов (1 — выполнять всё в текущем процессе)
+        
+        Вызывает:
+            ValueError: Если один столбец создают несколько обработчиков
+        """
+        self.handlers = list(handlers)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._threads: ThreadPoolExecutor | None = None
+        self._processes: ProcessPoolExecutor | None = None
+        # Имя фильтра строк → [строк на входе, строк на выходе] (копится между run)
+        self.filter_stats: dict[str, list[int]] = {}
+        
+        for i, first in enumerate(self.handlers):
+            for second in self.handlers[i + 1:]:
+                clash = [o for o in first.outputs for p in second.outputs if _matches(o, p)]
+                if clash:
+                    raise ValueError(
+                        f"Столбцы {clash} создают и {type(first).__name__}, и {type(second).__name__}"
+                    )
+    
+    def produces(self, column: str) -> bool:
+        """Создаёт ли столбец какой-либо обработчик графа."""
+        return any(_matches(column, o) for h in self.handlers for o in h.outputs)
+    
+    def _dependencies(self, handler: Handler) -> list[Handler]:
+        """Обработчики, которые должны выполниться раньше данного."""
+        deps = [
+            other for other in self.handlers
+            if other is not handler
+            and any(_matches(i, o) for i in handler.inputs for o in other.outputs)
+        ]
+        if not handler.filters_rows:
+            deps += [h for h in self.handlers if h.filters_rows and h not in deps]
+        return deps
+    
+    def plan(self, requested: list[str] | None = None) -> list[list[Handler]]:
+        """
+        Построить план выполнения по уровням графа.
+        
+        Аргументы:
+            requested: Нужные столбцы; None — выполнить все обработчики.
+                Обработчики-приёмники (без outputs) и фильтры строк
+                выполняются всегда.
+        
+        Возвращает:
+            Список уровней; обработчики внутри уровня независимы
+        
+        Вызывает:
+            ValueError: Если в графе есть цикл
+        """
+        needed = [
+            h for h in self.handlers
+            if requested is None or h.filters_rows or not h.outputs
+            or any(_matches(r, o) for r in requested for o in h.outputs)
+        ]
+        # Добавляем транзитивные зависимости
+        stack = list(needed)
+        while stack:
+            for dep in self._dependencies(stack.pop()):
+                if dep not in needed:
+                    needed.append(dep)
+                    stack.append(dep)
+        
+        levels, done = [], []
+        remaining = [h for h in self.handlers if h in needed]
+        while remaining:
+            ready = [h for h in remaining if all(d in done for d in self._dependencies(h))]
+            if not ready:
+                names = ", ".join(type(h).__name__ for h in remaining)
+                raise ValueError(f"Цикл в графе обработчиков: {names}")
+            # Фильтры строк выполняются по одному, в порядке объявления
+            filters = [h for h in ready if h.filters_rows]
+            ready = filters[:1] or ready
+            levels.append(ready)
+            done += ready
+            remaining = [h for h in remaining if h not in ready]
+        return levels
+    
+    def _executor(self, handler: Handler) -> Executor:
+        if handler.uses_processes:
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._processes
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self._threads
+    
+    def run(
+        self,
+        df: pd.DataFrame,
+        requested: list[str] | None = None,
+        filters_only: bool = False,
+        skip_filters: bool = False
+    ) -> pd.DataFrame:
+        """
+        Выполнить граф над DataFrame.
+        
+        Аргументы:
+            df: Входной DataFrame
+            requested: Нужные столбцы (None — все)
+            filters_only: Выполнить только уровни из фильтров строк
+                (например, чтобы собрать статистики по отобранным строкам)
+            skip_filters: Пропустить уровни из фильтров строк (df уже
+                обработан вызовом с filters_only=True)
+        
+        Возвращает:
+            DataFrame с добавленными столбцами выполненных обработчиков
+        """
+        levels = self.plan(requested)
+        if filters_only:
+            levels = [level for level in levels if all(h.filters_rows for h in level)]
+        elif skip_filters:
+            levels = [level for level in levels if not all(h.filters_rows for h in level)]
+        for level in levels:
+            logger.debug(f"Уровень графа: {', '.join(type(h).__name__ for h in level)}")
+            inline = [h for h in level if h.filters_rows or not h.outputs]
+            parallel = [h for h in level if h not in inline]
+            
+            for handler in inline:
+                rows_in = len(df)
+                df = handler.handle(df)
+                if handler.filters_rows:
+                    stats = self.filter_stats.setdefault(getattr(handler, "name", type(handler).__name__), [0, 0])
+                    stats[0] += rows_in
+                    stats[1] += len(df)
+            
+            if len(parallel) == 1 or (parallel and self.max_workers == 1):
+                results = [_run_handler(h, _select(df, h.inputs).copy()) for h in parallel]
+            else:
+                futures = [
+                    self._executor(h).submit(_run_handler, h, _select(df, h.inputs).copy())
+                    for h in parallel
+                ]
+                results = [f.result() for f in futures]
+            if results:
+                # concat создаёт новый DataFrame, не изменяя возможный срез df
+                df = pd.concat([df, *results], axis=1)
+        return df
+    
+    def close(self) -> None:
+        """Остановить пулы потоков и процессов."""
+        for executor in (self._threads, self._processes):
+            if executor is not None:
+                executor.shutdown()
+        self._threads = self._processes = None
@@ -4,9 +4,15 @@
 Извлекает возраст из строк вида "Мужчина , 42 года , родился 6 октября 1976".
 """
 
-import re
+import numpy as np
 import pandas as pd
 from .base_handler import Handler
+from .sketches import QuantileSketch
+from .strings import extract_numbers, is_text
+
+
+# \s в RE2 (движок pyarrow) не включает неразрывный пробел, поэтому он указан явно
+AGE_PATTERN = r"(?P<age>\d+)[\s\xa0]*[гл]"
 
 
 class AgeHandler(Handler):
@@ -14,8 +20,48 @@ class AgeHandler(Handler):
     Обработчик для извлечения возраста из текста профиля.
     
     Парсит строки, содержащие кириллические символы и неразрывные пробелы.
+    Пропуски заполняются медианой, которая оценивается объединяемым
+    KLL-скетчем: при обработке порциями скетчи порций объединяются и
+    передаются обработчику через set_summary().
     """
     
+    inputs = ("Пол, возраст",)
+    outputs = ("age",)
+    
+    def __init__(self, sketch_k: int = 200, exact_limit: int = 1_000_000) -> None:
+        """
+        Аргументы:
+            sketch_k: Точность скетча медианы
+            exact_limit: До скольких значений медиана считается точно
+        """
+        super().__init__()
+        self.sketch_k = sketch_k
+        self.exact_limit = exact_limit
+        self.summary: QuantileSketch | None = None
+    
+    @staticmethod
+    def _parse_ages(column: pd.Series) -> pd.Series:
+        """Возраст (float, NaN — не найден) векторным поиском по строковому столбцу."""
+        if not is_text(column):
+            return pd.Series(np.nan, index=column.index)
+        return extract_numbers(column, AGE_PATTERN)["age"]
+    
+    def summarize(self, df: pd.DataFrame) -> QuantileSketch:
+        """
+        Построить частичный скетч возрастов для порции данных.
+        
+        Аргументы:
+            df: Порция DataFrame с сырыми строками возраста
+        
+        Возвращает:
+            Скетч, который можно объединить со скетчами других порций
+        """
+        return QuantileSketch(self.sketch_k, self.exact_limit).update(self._parse_ages(df["Пол, возраст"]))
+    
+    def set_summary(self, summary: QuantileSketch | None) -> None:
+        """Задать глобальный скетч для заполнения пропусков (None — считать по df)."""
+        self.summary = summary
+    
     def handle(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Извлечь значения возраста из столбца 'Пол, возраст'.
@@ -26,14 +72,7 @@ class AgeHandler(Handler):
         Возвращает:
             DataFrame с новым столбцом 'age' (пропуски заполнены медианой)
         """
-        def parse_age(val) -> int | None:
-            if pd.isna(val):
-                return None
-            match = re.search(r"(\d+)\s*[гл]", str(val))
-            if match:
-                return int(match.group(1))
-            return None
-        
-        df["age"] = df["Пол, возраст"].apply(parse_age)
-        df["age"] = df["age"].fillna(df["age"].median())
+        df["age"] = self._parse_ages(df["Пол, возраст"])
+        summary = self.summary or QuantileSketch(self.sketch_k, self.exact_limit).update(df["age"])
+        df["age"] = df["age"].fillna(summary.median())
         return df
\ No newline at end of file
@@ -15,8 +15,23 @@ class Handler(ABC):
     
     Каждый конкретный обработчик должен реализовать метод handle()
     и может делегировать обработку следующему обработчику в цепочке.
+    
+    Для планирования в графе (см. handler_graph.py) обработчик объявляет
+    столбцы, которые читает (inputs) и создаёт (outputs). Имена столбцов
+    могут быть шаблонами fnmatch, например "city_*".
     """
     
+    # Столбцы, которые обработчик читает
+    inputs: tuple[str, ...] = ()
+    # Столбцы, которые обработчик создаёт (пусто — финальный обработчик-приёмник)
+    outputs: tuple[str, ...] = ()
+    # Удаляет ли обработчик строки (такие обработчики выполняются первыми)
+    filters_rows: bool = False
+    # Выполнять ли handle() в пуле процессов вместо пула потоков. Только для
+    # обработчиков на чистом Python, держащих GIL: входные столбцы копируются
+    # в дочерний процесс, а состояние, заданное в handle(), в родителе теряется
+    uses_processes: bool = False
+    
     def __init__(self) -> None:
         """Инициализация обработчика без следующего звена."""
         self._next_handler: Optional["Handler"] = None
@@ -0,0 +1,252 @@
+"""
+Кодировщик городов, общий для регрессии (задание №2) и классификации (задание №3).
+
+Словарь городов строится по частотам: top_k самых частых и/или города,
+встретившиеся не реже min_frequency раз. Остальные (и неизвестные при
+предсказании) города попадают в категорию "Other" либо, при n_buckets > 0,
+хешируются в фиксированное число корзин "Other#i" — так редкие города
+не теряются полностью, а ширина матрицы не растёт с данными.
+
+Словарь сохраняется в JSON (save/load) и передаётся обоим заданиям, поэтому
+кодирование при обучении и при предсказании одинаковое. Поиск кода —
+по словарю для уникальных значений, затем взятие по индексу для всех строк.
+
+Класс совместим с sklearn (fit/transform/get_params/get_feature_names_out)
+и может стоять внутри ColumnTransformer.
+"""
+
+import re
+import json
+import zlib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+
+OTHER = "Other"
+UNKNOWN = "Unknown"
+VOCABULARY_FORMAT_VERSION = 1
+
+# Только англоязычные варианты → русские названия
+CITY_ALIASES = {
+    "moscow": "Москва",
+    "saint petersburg": "Санкт-Петербург",
+    "spb": "Санкт-Петербург",
+}
+
+
+def _extract_city(val) -> str:
+    """Название города из строки "Москва , готов к переезду"."""
+    if pd.isna(val):
+        return UNKNOWN
+    city = str(val).split(",")[0].strip()
+    city = re.sub(r"[^а-яА-ЯёЁa-zA-Z\s-]", "", city).strip()
+    if not city:
+        return UNKNOWN
+    return CITY_ALIASES.get(city.lower(), city)
+
+
+def extract_cities(column: pd.Series) -> pd.Series:
+    """
+    Извлечь и нормализовать названия городов из сырого столбца "Город".
+    
+    Разбор выполняется один раз на уникальное значение; результат —
+    категориальный столбец (коды int8/int16 вместо строки на каждую ячейку).
+    """
+    codes, uniques = pd.factorize(column, use_na_sentinel=True)
+    parsed = [_extract_city(u) for u in uniques] + [UNKNOWN]
+    # Разные сырые строки могут дать один город ("Moscow" и "Москва")
+    city_codes, cities = pd.factorize(pd.Series(parsed, dtype=object))
+    # Код -1 (пропуск) указывает на последний элемент — UNKNOWN
+    categorical = pd.Categorical.from_codes(city_codes[codes], categories=cities)
+    return pd.Series(categorical, index=column.index)
+
+
+def _bucket(city: str, n_buckets: int) -> int:
+    """Стабильный между запусками и процессами номер корзины хеширования."""
+    return zlib.crc32(city.encode("utf-8")) % n_buckets
+
+
+class CityEncoder:
+    """
+    One-hot кодирование городов с ограниченным словарём.
+    
+    Столбцы выхода — отсортированные категории: города словаря и категории
+    для прочих городов ("Other" или корзины "Other#i").
+    """
+    
+    def __init__(
+        self,
+        top_k: int | None = None,
+        min_frequency: int = 1,
+        n_buckets: int = 0,
+        drop_first: bool = False,
+        vocabulary: list[str] | None = None,
+        other: bool | None = None,
+        prefix: str = "city"
+    ) -> None:
+        """
+        Аргументы:
+            top_k: Сколько самых частых городов оставить (None — без ограничения)
+            min_frequency: Минимальная частота города для попадания в словарь
+            n_buckets: Число корзин хеширования для прочих городов (0 — одна категория "Other")
+            drop_first: Не выводить первую категорию (для линейных моделей со свободным членом)
+            vocabulary: Готовый словарь — тогда fit() не пересчитывает его по данным
+            other: Нужна ли категория для прочих городов (None — если при fit()
+                какие-то города не вошли в словарь)
+            prefix: Префикс имён выходных столбцов
+        """
+        self.top_k = top_k
+        self.min_frequency = min_frequency
+        self.n_buckets = n_buckets
+        self.drop_first = drop_first
+        self.vocabulary = vocabulary
+        self.other = other
+        self.prefix = prefix
+        if vocabulary is not None:
+            self._build(vocabulary, bool(other))
+    
+    # --- Совместимость с sklearn (clone, ColumnTransformer) ---
+    
+    def get_params(self, deep: bool = True) -> dict:
+        return {
+            "top_k": self.top_k,
+            "min_frequency": self.min_frequency,
+            "n_buckets": self.n_buckets,
+            "drop_first": self.drop_first,
+            "vocabulary": self.vocabulary,
+            "other": self.other,
+            "prefix": self.prefix,
+        }
+    
+    def set_params(self, **params) -> "CityEncoder":
+        for name, value in params.items():
+            setattr(self, name, value)
+        return self
+    
+    # --- Обучение словаря ---
+    
+    def _build(self, vocabulary: list[str], other: bool) -> None:
+        """Построить категории и таблицы поиска по словарю."""
+        self.vocabulary_ = sorted(vocabulary)
+        if not other:
+            oov = []
+        elif self.n_buckets > 0:
+            oov = [f"{OTHER}#{i}" for i in range(self.n_buckets)]
+        else:
+            oov = [OTHER]
+        self.other_ = other
+        self.categories_ = sorted([*self.vocabulary_, *oov])
+        self._index = {name: i for i, name in enumerate(self.categories_)}
+        self._oov_codes = np.array([self._index[name] for name in oov], dtype=np.int64)
+    
+    def fit_counts(self, counts: dict[str, int], exact: bool = True) -> "CityEncoder":
+        """
+        Построить словарь по частотам городов (например, из TopKSketch).
+        
+        Аргументы:
+            counts: Город → число вхождений
+            exact: Точные ли частоты (если нет, категория прочих городов нужна всегда)
+        """
+        if self.vocabulary is not None:
+            return self
+        # Сортировка устойчива: при равных частотах сохраняется порядок counts
+        ranked = sorted(counts.items(), key=lambda kv: -kv[1])
+        vocabulary = [city for city, count in ranked if count >= self.min_frequency]
+        if self.top_k is not None:
+            vocabulary = vocabulary[:self.top_k]
+        other = self.other if self.other is not None else (len(vocabulary) < len(counts) or not exact)
+        self._build(vocabulary, other)
+        return self
+    
+    @staticmethod
+    def _as_series(X) -> pd.Series:
+        if isinstance(X, pd.DataFrame):
+            return X.iloc[:, 0]
+        if isinstance(X, pd.Series):
+            return X
+        X = np.asarray(X, dtype=object)
+        return pd.Series(X[:, 0] if X.ndim == 2 else X)
+    
+    def fit(self, X, y=None) -> "CityEncoder":
+        """Построить словарь по столбцу уже извлечённых названий городов."""
+        if self.vocabulary is not None:
+            return self
+        counts = self._as_series(X).value_counts()
+        # У категориального столбца value_counts включает и невстреченные категории
+        counts = counts[counts > 0]
+        return self.fit_counts(dict(zip(counts.index, counts.to_numpy().tolist())))
+    
+    # --- Кодирование ---
+    
+    def codes(self, X) -> np.ndarray:
+        """
+        Номера категорий для каждой строки (-1 — неизвестный город без категории прочих).
+        """
+        cities = self._as_series(X)
+        if isinstance(cities.dtype, pd.CategoricalDtype):
+            # Поиск по категориям, затем взятие по кодам строк; код -1 (пропуск) — последний элемент
+            row_codes, uniques = cities.cat.codes.to_numpy(), [*cities.cat.categories, None]
+        else:
+            row_codes, uniques = pd.factorize(cities, use_na_sentinel=False)
+        unique_codes = np.empty(len(uniques), dtype=np.int64)
+        for i, city in enumerate(uniques):
+            code = self._index.get(city)
+            if code is None:
+                if not self.other_:
+                    code = -1
+                elif self.n_buckets > 0:
+                    code = self._oov_codes[_bucket(str(city), self.n_buckets)]
+                else:
+                    code = self._oov_codes[0]
+            unique_codes[i] = code
+        return unique_codes[row_codes]
+    
+    def transform(self, X) -> np.ndarray:
+        """One-hot матрица (n_samples, n_features) в float64."""
+        codes = self.codes(X)
+        out = np.zeros((len(codes), len(self.categories_)))
+        known = codes >= 0
+        out[np.flatnonzero(known), codes[known]] = 1.0
+        return out[:, 1:] if self.drop_first else out
+    
+    def fit_transform(self, X, y=None) -> np.ndarray:
+        return self.fit(X).transform(X)
+    
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        categories = self.categories_[1:] if self.drop_first else self.categories_
+        return np.array([f"{self.prefix}_{name}" for name in categories], dtype=object)
+    
+    # --- Сохранение словаря ---
+    
+    def frozen(self) -> "CityEncoder":
+        """Копия с зафиксированным словарём (fit() её не меняет)."""
+        params = {**self.get_params(), "vocabulary": list(self.vocabulary_), "other": self.other_}
+        return CityEncoder(**params)
+    
+    def save(self, path: str | Path) -> None:
+        """Сохранить словарь и параметры кодирования в JSON."""
+        data = {
+            "format_version": VOCABULARY_FORMAT_VERSION,
+            **self.frozen().get_params(),
+        }
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    
+    @classmethod
+    def load(cls, path: str | Path) -> "CityEncoder":
+        """
+        Загрузить кодировщик с зафиксированным словарём.
+        
+        Вызывает:
+            FileNotFoundError: Если файла нет
+            ValueError: Если файл записан более новой версией формата
+        """
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        version = data.pop("format_version", 1)
+        if version > VOCABULARY_FORMAT_VERSION:
+            raise ValueError(f"Формат словаря городов v{version} новее поддерживаемого v{VOCABULARY_FORMAT_VERSION}")
+        return cls(**data)
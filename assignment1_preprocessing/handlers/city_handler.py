@@ -1,51 +1,99 @@
 """
 Обработчик города.
 
-Извлекает название города и нормализует англоязычные варианты (Moscow → Москва).
+Извлекает название города, нормализует англоязычные варианты (Moscow → Москва)
+и кодирует его через CityEncoder (см. city_encoder.py).
 """
 
-import re
 import pandas as pd
 from .base_handler import Handler
+from .city_encoder import CityEncoder, extract_cities
+from .sketches import TopKSketch
 
 
 class CityHandler(Handler):
     """
     Обработчик для извлечения и кодирования названий городов.
+    
+    Словарь городов строится по объединяемому скетчу SpaceSaving: при обработке
+    порциями скетчи порций объединяются и передаются через set_summary().
+    Если передан готовый кодировщик (например, загруженный из сохранённого
+    словаря), он используется как есть и скетч не нужен.
+    
+    DataPipeline строит кодировщик заранее в своём процессе (fit_encoder)
+    и передаёт его в encoder: handle() может выполняться в пуле процессов,
+    и состояние, заданное внутри него, в родительский процесс не вернётся.
     """
     
-    def __init__(self):
+    inputs = ("Город",)
+    outputs = ("city_*",)
+    
+    def __init__(
+        self,
+        top_k: int | None = 10,
+        sketch_capacity: int = 2048,
+        min_frequency: int = 1,
+        n_buckets: int = 0,
+        encoder: CityEncoder | None = None
+    ):
+        """
+        Аргументы:
+            top_k: Сколько самых частых городов кодировать отдельно
+            sketch_capacity: Размер скетча частот городов
+            min_frequency: Минимальная частота города для попадания в словарь
+            n_buckets: Число корзин хеширования для прочих городов (0 — одна категория "Other")
+            encoder: Готовый кодировщик с зафиксированным словарём
+        """
         super().__init__()
-        # Только англоязычные варианты → русские названия
-        self.city_map = {
-            "moscow": "Москва",
-            "saint petersburg": "Санкт-Петербург",
-            "spb": "Санкт-Петербург",
-        }
-    
-    def _normalize_city(self, city: str) -> str:
-        """Нормализовать англоязычные названия, остальные оставить как есть."""
-        if pd.isna(city):
-            return "Unknown"
-        city_clean = city.strip().lower()
-        return self.city_map.get(city_clean, city.strip())
+        self.top_k = top_k
+        self.sketch_capacity = sketch_capacity
+        self.min_frequency = min_frequency
+        self.n_buckets = n_buckets
+        self.encoder = encoder
+        self.summary: TopKSketch | None = None
+    
+    def summarize(self, df: pd.DataFrame) -> TopKSketch:
+        """
+        Построить частичный скетч частот городов для порции данных.
+        
+        Аргументы:
+            df: Порция DataFrame с сырым столбцом 'Город'
+        
+        Возвращает:
+            Скетч, который можно объединить со скетчами других порций
+        """
+        return TopKSketch(self.sketch_capacity).update(extract_cities(df["Город"]))
+    
+    def set_summary(self, summary: TopKSketch | None) -> None:
+        """Задать глобальный скетч частот городов (None — считать по df)."""
+        self.summary = summary
+    
+    def fit_encoder(self, summary: TopKSketch) -> CityEncoder:
+        """Построить кодировщик (с drop_first для регрессии) по скетчу частот."""
+        encoder = CityEncoder(
+            top_k=self.top_k,
+            min_frequency=self.min_frequency,
+            n_buckets=self.n_buckets,
+            drop_first=True
+        )
+        return encoder.fit_counts(summary.counts(), exact=summary.is_exact)
     
     def handle(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Извлечь названия городов и выполнить one-hot кодирование.
+        
+        Набор столбцов city_* определяется только словарём кодировщика,
+        поэтому у всех порций, обработанных с одним скетчем или одним
+        сохранённым словарём, он одинаковый.
         """
-        def extract_city(val) -> str:
-            if pd.isna(val):
-                return "Unknown"
-            parts = str(val).split(",")
-            if parts:
-                city = parts[0].strip()
-                city = re.sub(r"[^а-яА-ЯёЁa-zA-Z\s-]", "", city).strip()
-                return self._normalize_city(city) if city else "Unknown"
-            return "Unknown"
+        cities = extract_cities(df["Город"])
+        encoder = self.encoder
+        if encoder is None:
+            encoder = self.fit_encoder(self.summary or TopKSketch(self.sketch_capacity).update(cities))
         
-        df["city"] = df["Город"].apply(extract_city)
-        top_cities = df["city"].value_counts().nlargest(10).index.tolist()
-        df["city"] = df["city"].apply(lambda x: x if x in top_cities else "Other")
-        df = pd.get_dummies(df, columns=["city"], prefix="city", drop_first=True)
-        return df
\ No newline at end of file
+        encoded = pd.DataFrame(
+            encoder.transform(cities).astype(bool),
+            columns=encoder.get_feature_names_out(),
+            index=df.index
+        )
+        return pd.concat([df, encoded], axis=1)
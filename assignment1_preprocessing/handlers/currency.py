@@ -0,0 +1,127 @@
+"""
+Таблица курсов валют для пересчёта зарплат в рубли.
+
+Курсы хранятся во внешнем CSV-файле (date, currency, rate_rub) с версиями
+по датам. Валюта и сумма определяются векторно по всему столбцу, пересчёт
+выполняется одним умножением массивов.
+"""
+
+import re
+import logging
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATES_PATH = Path(__file__).resolve().parent.parent / "resources" / "currency_rates.csv"
+
+# Обозначения валют в строке зарплаты → ISO-код.
+# Берётся самое левое совпадение; при совпадении в одной позиции — первое в словаре.
+CURRENCY_TOKENS = {
+    "бел. руб": "BYN", "бел.руб": "BYN", "byn": "BYN", "byr": "BYN",
+    "kzt": "KZT", "тенге": "KZT", "₸": "KZT",
+    "eur": "EUR", "€": "EUR",
+    "usd": "USD", "$": "USD",
+    "uah": "UAH", "грн": "UAH", "₴": "UAH",
+    "uzs": "UZS", "сум": "UZS",
+    "kgs": "KGS", "сом": "KGS",
+    "azn": "AZN", "₼": "AZN",
+    "gel": "GEL", "₾": "GEL",
+    "amd": "AMD", "֏": "AMD",
+    "руб": "RUB", "rub": "RUB", "rur": "RUB", "₽": "RUB",
+}
+DEFAULT_CURRENCY = "RUB"
+
+_CURRENCY_RE = "(" + "|".join(re.escape(token) for token in CURRENCY_TOKENS) + ")"
+
+
+class CurrencyTable:
+    """
+    Курсы валют к рублю на определённую дату.
+    
+    Строки без распознанной валюты считаются рублёвыми. Строки в валюте,
+    для которой нет курса на эту дату, пересчитать нельзя: они получают NaN,
+    а число таких строк по валютам пишется в лог предупреждением.
+    """
+    
+    def __init__(self, rates: dict[str, float], as_of: str | None = None) -> None:
+        """
+        Аргументы:
+            rates: Курс к рублю для каждого ISO-кода валюты
+            as_of: Дата, на которую действуют курсы (для логов и отладки)
+        """
+        self.rates = {DEFAULT_CURRENCY: 1.0, **rates}
+        self.as_of = as_of
+        # Предупреждать о строках без курса (отключается на проходах, которые
+        # повторно читают те же строки, например при сборе скетчей)
+        self.warn_missing_rates = True
+        self._codes = list(self.rates)
+        self._rate_array = np.array([self.rates[c] for c in self._codes], dtype=float)
+    
+    @classmethod
+    def from_csv(cls, path: str | Path = DEFAULT_RATES_PATH, as_of: str | None = None) -> "CurrencyTable":
+        """
+        Загрузить курсы из CSV-файла с версиями по датам.
+        
+        Для каждой валюты берётся последний курс с датой не позже as_of
+        (по умолчанию — самый свежий).
+        
+        Вызывает:
+            FileNotFoundError: Если файл курсов не найден
+            ValueError: Если на дату as_of нет ни одного курса
+        """
+        table = pd.read_csv(path, parse_dates=["date"])
+        if as_of is not None:
+            table = table[table["date"] <= pd.Timestamp(as_of)]
+        if table.empty:
+            raise ValueError(f"В {path} нет курсов на дату {as_of}")
+        latest = table.sort_values("date").groupby("currency").last()
+        return cls(latest["rate_rub"].astype(float).to_dict(), as_of or str(latest["date"].max().date()))
+    
+    def classify(self, values: pd.Series) -> pd.Series:
+        """Определить ISO-код валюты для каждой строки зарплаты."""
+        tokens = values.str.lower().str.extract(_CURRENCY_RE, expand=False)
+        return tokens.map(CURRENCY_TOKENS).fillna(DEFAULT_CURRENCY)
+    
+    def convert(self, values: pd.Series) -> pd.Series:
+        """
+        Пересчитать строки зарплат в рубли.
+        
+        Строки зарплат сильно повторяются ("60 000 руб."), поэтому разбор
+        выполняется только по уникальным значениям, а результат раскладывается
+        обратно по кодам factorize.
+        
+        Возвращает:
+            Series float-значений (NaN — если сумму извлечь не удалось,
+            значение не является строкой или для валюты нет курса)
+        """
+        if not pd.api.types.is_string_dtype(values) and not pd.api.types.is_object_dtype(values):
+            return pd.Series(np.nan, index=values.index)
+        
+        codes, uniques = pd.factorize(values)
+        # Уникальные значения сохраняют тип столбца (string[pyarrow] — без объектов Python)
+        uniques = pd.Series(uniques)
+        amount = pd.to_numeric(
+            uniques.str.replace(r"[\s\xa0]", "", regex=True).str.extract(r"(\d+)", expand=False),
+            errors="coerce"
+        ).to_numpy(dtype=float)
+        iso_codes = self.classify(uniques)
+        currency = pd.Categorical(iso_codes, categories=self._codes).codes
+        rate = np.where(currency >= 0, self._rate_array[currency], np.nan)
+        no_rate = (currency < 0) & ~np.isnan(amount)
+        if self.warn_missing_rates and no_rate.any():
+            rows = np.bincount(codes[codes >= 0], minlength=len(uniques))
+            self._warn_no_rate(iso_codes[no_rate], rows[no_rate])
+        
+        # Для NaN в исходных данных factorize возвращает код -1
+        amount = np.append(amount, np.nan)
+        rate = np.append(rate, np.nan)
+        return pd.Series(amount[codes] * rate[codes], index=values.index)
+    
+    def _warn_no_rate(self, iso_codes: pd.Series, rows: np.ndarray) -> None:
+        """Сообщить, сколько строк каждой валюты без курса не удалось пересчитать."""
+        dropped = pd.Series(rows, index=iso_codes.to_numpy()).groupby(level=0).sum()
+        for code, count in dropped.items():
+            logger.warning(f"Нет курса {code} на {self.as_of}: {count} строк с зарплатой в {code} не пересчитаны и отброшены")
@@ -5,18 +5,26 @@
 содержащего полную историю трудоустройства.
 """
 
-import re
 import pandas as pd
 from .base_handler import Handler
+from .strings import extract_numbers, is_text, replace_text
+
+
+YEARS_MONTHS_PATTERN = r"Опыт работы\s+(?P<years>\d+)\s+лет?\s+(?P<months>\d+)\s+месяц"
+YEARS_PATTERN = r"Опыт работы\s+(?P<years>\d+)\s+лет?"
 
 
 class ExperienceHandler(Handler):
     """
     Обработчик для извлечения общего стажа работы в годах.
     
-    Парсит строки в формате "Опыт работы X лет Y месяцев".
+    Парсит строки в формате "Опыт работы X лет Y месяцев" векторными
+    операциями над строковым столбцом (без разбора по одной строке).
     """
     
+    inputs = ("Опыт (двойное нажатие для полной версии)",)
+    outputs = ("experience_years",)
+    
     def handle(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Извлечь продолжительность опыта работы в годах из текстового поля.
@@ -27,24 +35,18 @@ class ExperienceHandler(Handler):
         Возвращает:
             DataFrame с новым столбцом 'experience_years' типа float
         """
-        def parse_experience(val) -> float:
-            if pd.isna(val):
-                return 0.0
-            text = str(val).replace("\xa0", " ")
-            
-            # Формат: "Опыт работы X лет Y месяцев"
-            match = re.search(r"Опыт работы\s+(\d+)\s+лет?\s+(\d+)\s+месяц", text)
-            if match:
-                return int(match.group(1)) + int(match.group(2)) / 12.0
-            
-            # Формат: "Опыт работы X лет"
-            match = re.search(r"Опыт работы\s+(\d+)\s+лет?", text)
-            if match:
-                return float(match.group(1))
-            
-            return 0.0
+        text = df["Опыт (двойное нажатие для полной версии)"]
+        if not is_text(text):
+            df["experience_years"] = 0.0
+            return df
+        text = replace_text(text, "\xa0", " ")
+        
+        # Формат: "Опыт работы X лет Y месяцев"
+        full = extract_numbers(text, YEARS_MONTHS_PATTERN)
+        years = full["years"] + full["months"] / 12.0
+        
+        # Формат: "Опыт работы X лет"
+        years_only = extract_numbers(text, YEARS_PATTERN)["years"]
         
-        df["experience_years"] = df["Опыт (двойное нажатие для полной версии)"].apply(
-            parse_experience
-        )
+        df["experience_years"] = years.fillna(years_only).fillna(0.0)
         return df
\ No newline at end of file
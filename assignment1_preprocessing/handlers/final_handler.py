@@ -4,11 +4,15 @@
 Извлекает матрицу признаков и целевую переменную для обучения моделей.
 """
 
+import fnmatch
 import numpy as np
 import pandas as pd
 from .base_handler import Handler
 
 
+DEFAULT_FEATURES = ["age", "experience_years", "city_*"]
+
+
 class FinalHandler(Handler):
     """
     Финальный обработчик, подготавливающий выходные массивы для машинного обучения.
@@ -16,11 +20,21 @@ class FinalHandler(Handler):
     Собирает все обработанные признаки и целевую переменную в numpy-массивы.
     """
     
-    def __init__(self) -> None:
-        """Инициализация с пустыми выходными массивами."""
+    def __init__(self, features: list[str] | None = None) -> None:
+        """
+        Инициализация с пустыми выходными массивами.
+        
+        Аргументы:
+            features: Признаки в порядке столбцов x_data (допускаются шаблоны
+                вида "city_*"); по умолчанию — возраст, опыт и города
+        """
         super().__init__()
+        self.features = list(features or DEFAULT_FEATURES)
+        self.inputs = (*self.features, "salary_num")
         self.x_data = None
         self.y_data = None
+        # Имена столбцов x_data в порядке следования (схема признаков)
+        self.feature_names: list[str] | None = None
 
     def handle(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -32,10 +46,13 @@ class FinalHandler(Handler):
         Возвращает:
             Исходный DataFrame (без изменений)
         """
-        numeric_cols = ["age", "experience_years"]
-        city_cols = [col for col in df.columns if col.startswith("city_")]
-        feature_cols = numeric_cols + city_cols
+        feature_cols = [
+            col
+            for feature in self.features
+            for col in (fnmatch.filter(df.columns, feature) if "*" in feature else [feature])
+        ]
         
+        self.feature_names = feature_cols
         self.x_data = df[feature_cols].fillna(0).astype(float).values
         self.y_data = df["salary_num"].values.astype(float)
         return df
@@ -0,0 +1,162 @@
+"""
+Предикаты строк для раннего отбора резюме.
+
+Предикат — обработчик-фильтр (filters_rows = True), который только удаляет
+строки. Предикаты над сырыми столбцами CSV пайплайн применяет прямо при
+чтении файла, предикаты над производными столбцами (например, salary_num) —
+сразу после обработчика, создающего эти столбцы. Так дорогой разбор текста
+(опыт, города) не выполняется для строк, которые всё равно будут отброшены.
+"""
+
+import re
+import pandas as pd
+from abc import abstractmethod
+from .base_handler import Handler
+
+
+# Ключевые слова должностей разработчиков — единое определение для
+# --developers-only и фильтра разработчиков классификатора (задание №3)
+DEVELOPER_KEYWORDS = [
+    "программист", "разработчик", "прогер", "разраб",
+    "frontend", "front-end", "front end",
+    "backend", "back-end", "back end",
+    "fullstack", "full-stack", "full stack",
+    "web-программист", "веб-программист",
+    "1с", "1 с", "1с:", "1 с:",
+    "java", "python", "c#", "c++", "c/c++", "javascript", "js",
+    "typescript", "ts", "go", "golang", "rust", "ruby", "php",
+    "flutter", "react", "vue", "angular", "django", "flask",
+    "spring", "dotnet", ".net", "kotlin", "swift", "scala"
+]
+NON_DEVELOPER_KEYWORDS = [
+    "администратор", "админ", "сисадмин", "системный администратор",
+    "инженер", "техник", "монтажник", "электрик", "механик",
+    "менеджер", "руководитель", "директор", "начальник",
+    "аналитик", "бизнес-аналитик", "системный аналитик",
+    "тестировщик", "qa", "автотест", "ручное тестирование",
+    "дизайнер", "верстальщик", "маркетолог", "контент",
+    "продаж", "поддержка", "консультант", "оператор",
+    "архитектор", "девопс", "администрирование", "сопровождение"
+]
+# Должности, для которых запрещённые слова игнорируются
+DEVELOPER_EXCEPTIONS = ["инженер-программист"]
+
+
+class RowPredicate(Handler):
+    """
+    Базовый класс предиката строк.
+    
+    Наследники реализуют mask() и объявляют в inputs столбцы, которые читают.
+    """
+    
+    filters_rows = True
+    
+    @property
+    def name(self) -> str:
+        """Имя предиката для отчёта о числе отброшенных строк."""
+        return type(self).__name__
+    
+    @abstractmethod
+    def mask(self, df: pd.DataFrame) -> pd.Series:
+        """
+        Вычислить маску строк, которые нужно оставить.
+        
+        Аргументы:
+            df: DataFrame со столбцами из inputs
+        
+        Возвращает:
+            Булева Series с индексом df
+        """
+        pass
+    
+    def handle(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Оставить только строки, удовлетворяющие предикату."""
+        return df[self.mask(df)]
+
+
+class SalaryPresent(RowPredicate):
+    """
+    Дешёвая проверка сырой зарплаты: строка содержит хотя бы одну цифру.
+    
+    Отбрасывает строки, которые SalaryHandler всё равно удалил бы,
+    ещё до пересчёта валют.
+    """
+    
+    inputs = ("ЗП",)
+    
+    def mask(self, df: pd.DataFrame) -> pd.Series:
+        column = df["ЗП"]
+        if not pd.api.types.is_string_dtype(column) and not pd.api.types.is_object_dtype(column):
+            return pd.Series(False, index=df.index)
+        return column.str.contains(r"\d", regex=True, na=False).astype(bool)
+
+
+class SalaryRange(RowPredicate):
+    """Зарплата в рублях в заданных границах (включительно)."""
+    
+    inputs = ("salary_num",)
+    
+    def __init__(self, min_salary: float | None = None, max_salary: float | None = None) -> None:
+        """
+        Аргументы:
+            min_salary: Нижняя граница (None — без ограничения)
+            max_salary: Верхняя граница (None — без ограничения)
+        """
+        super().__init__()
+        self.min_salary = min_salary
+        self.max_salary = max_salary
+    
+    def mask(self, df: pd.DataFrame) -> pd.Series:
+        salary = df["salary_num"]
+        keep = salary.notna()
+        if self.min_salary is not None:
+            keep &= salary >= self.min_salary
+        if self.max_salary is not None:
+            keep &= salary <= self.max_salary
+        return keep
+
+
+class TitleKeywords(RowPredicate):
+    """
+    Отбор по ключевым словам в желаемой должности.
+    
+    Должность должна содержать одно из include и не содержать exclude,
+    если только она не содержит одно из exceptions. Проверка подстрок
+    выполняется векторно одним регулярным выражением на список.
+    """
+    
+    inputs = ("Ищет работу на должность:",)
+    
+    def __init__(self, include: list[str], exclude: list[str] = (), exceptions: list[str] = ()) -> None:
+        """
+        Аргументы:
+            include: Обязательные ключевые слова (достаточно одного)
+            exclude: Запрещённые ключевые слова
+            exceptions: Слова, при которых запрещённые слова игнорируются
+        """
+        super().__init__()
+        self.include = list(include)
+        self.exclude = list(exclude)
+        self.exceptions = list(exceptions)
+    
+    @staticmethod
+    def _contains_any(titles: pd.Series, keywords: list[str]) -> pd.Series:
+        if not keywords:
+            return pd.Series(False, index=titles.index)
+        pattern = "|".join(re.escape(kw) for kw in keywords)
+        return titles.str.contains(pattern, regex=True, na=False).astype(bool)
+    
+    def mask(self, df: pd.DataFrame) -> pd.Series:
+        titles = df["Ищет работу на должность:"]
+        if not pd.api.types.is_string_dtype(titles) and not pd.api.types.is_object_dtype(titles):
+            return pd.Series(False, index=df.index)
+        titles = titles.str.lower().str.strip()
+        excluded = self._contains_any(titles, self.exclude) & ~self._contains_any(titles, self.exceptions)
+        return self._contains_any(titles, self.include) & ~excluded
+
+
+class DeveloperTitle(TitleKeywords):
+    """Только резюме разработчиков (та же логика, что в задании №3)."""
+    
+    def __init__(self) -> None:
+        super().__init__(DEVELOPER_KEYWORDS, NON_DEVELOPER_KEYWORDS, DEVELOPER_EXCEPTIONS)
@@ -3,12 +3,13 @@
 
 Извлекает числовые значения зарплаты из строк вида "60 000 руб." или "от 100 000 руб."
 Корректно обрабатывает неразрывные пробелы (\xa0) и различные форматы.
+Суммы в иностранной валюте пересчитываются в рубли по таблице курсов.
 """
 
-import re
 import pandas as pd
-from typing import Optional
+from pathlib import Path
 from .base_handler import Handler
+from .currency import CurrencyTable, DEFAULT_RATES_PATH
 
 
 class SalaryHandler(Handler):
@@ -16,9 +17,23 @@ class SalaryHandler(Handler):
     Обработчик для извлечения и нормализации значений зарплаты.
     
     Парсит строки с зарплатой, удаляет неразрывные пробелы и преобразует
-    в числовые значения в рублях.
+    в числовые значения в рублях. Валюта определяется векторно по всему
+    столбцу, курсы берутся из внешнего файла с версиями по датам.
     """
     
+    inputs = ("ЗП",)
+    outputs = ("salary_num",)
+    filters_rows = True
+    
+    def __init__(self, rates_path: str | Path = DEFAULT_RATES_PATH, rates_date: str | None = None) -> None:
+        """
+        Аргументы:
+            rates_path: CSV-файл курсов валют (date, currency, rate_rub)
+            rates_date: Дата курсов в формате YYYY-MM-DD (по умолчанию — самые свежие)
+        """
+        super().__init__()
+        self.currency_table = CurrencyTable.from_csv(rates_path, rates_date)
+    
     def handle(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Извлечь числовые значения зарплаты из столбца 'ЗП'.
@@ -29,29 +44,6 @@ class SalaryHandler(Handler):
         Возвращает:
             DataFrame с новым столбцом 'salary_num', содержащим float-значения
         """
-        def parse_salary(val) -> Optional[float]:
-            if pd.isna(val) or not isinstance(val, str):
-                return None
-            
-            # Определяем валюту
-            val_lower = val.lower()
-            if "kzt" in val_lower:
-                rate = 0.021  # 1 KZT ≈ 0.021 RUB
-            elif "eur" in val_lower or "€" in val_lower:
-                rate = 90.0   # 1 EUR ≈ 90 RUB
-            elif "usd" in val_lower or "$" in val_lower:
-                rate = 85.0   # 1 USD ≈ 85 RUB
-            else:
-                rate = 1.0    # рубли
-            
-            # Извлекаем число
-            match = re.search(r"(\d[\d\s\xa0]*)", val)
-            if match:
-                clean = re.sub(r"[\s\xa0]", "", match.group(1))
-                if clean.isdigit():
-                    return float(clean) * rate
-            return None
-        
-        df["salary_num"] = df["ЗП"].apply(parse_salary)
+        df["salary_num"] = self.currency_table.convert(df["ЗП"])
         df = df.dropna(subset=["salary_num"])
         return df
\ No newline at end of file
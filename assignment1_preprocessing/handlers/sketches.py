@@ -0,0 +1,165 @@
+"""
+Объединяемые приближённые статистики для глобальных редукций обработчиков.
+
+QuantileSketch — KLL-скетч для квантилей (медиана возраста), TopKSketch —
+алгоритм SpaceSaving для самых частых значений (топ городов). Порции данных
+или партиции строят частичные скетчи независимо, затем скетчи дёшево
+объединяются через merge(). Пока данных мало, оба скетча хранят их точно
+и дают тот же результат, что и pandas.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class QuantileSketch:
+    """
+    KLL-скетч квантилей.
+    
+    Ранговая погрешность — порядка 1.7 / k от числа значений. Пока значений
+    не больше exact_limit, они хранятся целиком и квантили считаются точно
+    (как pandas.Series.quantile).
+    """
+    
+    def __init__(self, k: int = 200, exact_limit: int = 1_000_000, seed: int = 42) -> None:
+        """
+        Аргументы:
+            k: Точность скетча (больше k — меньше погрешность и больше памяти)
+            exact_limit: До скольких значений хранить данные точно
+            seed: Зерно генератора для случайного выбора при сжатии
+        """
+        self.k = k
+        self.exact_limit = exact_limit
+        self.count = 0
+        self._levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+    
+    @classmethod
+    def from_error(cls, rank_error: float, **kwargs) -> "QuantileSketch":
+        """Создать скетч с заданной ранговой погрешностью (например, 0.01)."""
+        return cls(k=max(int(np.ceil(1.7 / rank_error)), 8), **kwargs)
+    
+    @property
+    def is_exact(self) -> bool:
+        """Хранит ли скетч все значения без сжатия."""
+        return len(self._levels) == 1 and len(self._levels[0]) == self.count
+    
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+    
+    def _compress(self) -> None:
+        if self.count <= self.exact_limit:
+            return
+        level = 0
+        while level < len(self._levels):
+            items = self._levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self._levels):
+                    self._levels.append(np.empty(0))
+                items = np.sort(items)
+                # При нечётном числе одно значение остаётся на текущем уровне
+                keep = items[:1] if len(items) % 2 else items[:0]
+                pairs = items[len(keep):]
+                promoted = pairs[self._rng.integers(2)::2]
+                self._levels[level] = keep
+                self._levels[level + 1] = np.concatenate([self._levels[level + 1], promoted])
+            level += 1
+    
+    def update(self, values) -> "QuantileSketch":
+        """Добавить значения (NaN пропускаются)."""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self.count += len(values)
+        self._compress()
+        return self
+    
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Объединить со скетчем другой порции данных (на месте)."""
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for level, items in enumerate(other._levels):
+            self._levels[level] = np.concatenate([self._levels[level], items])
+        self.count += other.count
+        self._compress()
+        return self
+    
+    def quantile(self, q: float) -> float:
+        """Оценка q-квантиля (NaN, если значений нет)."""
+        if self.count == 0:
+            return float("nan")
+        if self.is_exact:
+            return float(np.quantile(self._levels[0], q))
+        values = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(len(items), 2 ** level) for level, items in enumerate(self._levels)])
+        order = np.argsort(values)
+        cumulative = np.cumsum(weights[order])
+        idx = np.searchsorted(cumulative, q * cumulative[-1], side="left")
+        return float(values[order][min(idx, len(values) - 1)])
+    
+    def median(self) -> float:
+        return self.quantile(0.5)
+
+
+class TopKSketch:
+    """
+    Скетч SpaceSaving для поиска самых частых значений.
+    
+    Хранит не более capacity счётчиков; завышение счётчика не превышает
+    N / capacity. Пока различных значений не больше capacity, счёт точный.
+    """
+    
+    def __init__(self, capacity: int = 2048) -> None:
+        """
+        Аргументы:
+            capacity: Максимальное число отслеживаемых значений
+        """
+        self.capacity = capacity
+        self.count = 0
+        self.is_exact = True
+        self._counts: dict = {}
+    
+    def update(self, values: pd.Series) -> "TopKSketch":
+        """Добавить значения (порция предварительно агрегируется value_counts)."""
+        counts = values.value_counts()
+        # У категориального столбца value_counts включает и невстреченные категории
+        counts = counts[counts > 0]
+        for item, weight in zip(counts.index, counts.to_numpy().tolist()):
+            if item in self._counts:
+                self._counts[item] += weight
+            elif len(self._counts) < self.capacity:
+                self._counts[item] = weight
+            else:
+                # Вытесняем самый редкий счётчик, новое значение наследует его счёт
+                victim = min(self._counts, key=self._counts.get)
+                self._counts[item] = self._counts.pop(victim) + weight
+                self.is_exact = False
+        self.count += len(values) - int(values.isna().sum())
+        return self
+    
+    def merge(self, other: "TopKSketch") -> "TopKSketch":
+        """Объединить со скетчем другой порции данных (на месте)."""
+        merged = dict(self._counts)
+        for item, weight in other._counts.items():
+            merged[item] = merged.get(item, 0) + weight
+        if len(merged) > self.capacity:
+            merged = dict(sorted(merged.items(), key=lambda kv: -kv[1])[:self.capacity])
+            self.is_exact = False
+        self._counts = merged
+        self.count += other.count
+        self.is_exact = self.is_exact and other.is_exact
+        return self
+    
+    def __len__(self) -> int:
+        """Число отслеживаемых значений."""
+        return len(self._counts)
+    
+    def counts(self) -> dict:
+        """Оценки частот всех отслеживаемых значений."""
+        return dict(self._counts)
+    
+    def top_k(self, k: int) -> list:
+        """k самых частых значений по убыванию оценки частоты."""
+        counts = pd.Series(self._counts, dtype="int64")
+        return counts.sort_values(ascending=False, kind="stable").index[:k].tolist()
@@ -0,0 +1,63 @@
+"""
+Векторные операции над текстовыми столбцами.
+
+Столбцы string[pyarrow] обрабатываются вычислительными функциями pyarrow
+прямо над буферами Arrow, без создания объекта Python на каждую строку;
+для столбцов object используются обычные методы pandas .str.
+"""
+
+import pandas as pd
+
+
+def is_text(column: pd.Series) -> bool:
+    """Столбец строк (object или string); числовые столбцы текстом не считаются."""
+    return pd.api.types.is_string_dtype(column) or pd.api.types.is_object_dtype(column)
+
+
+def _is_arrow(column: pd.Series) -> bool:
+    return isinstance(column.dtype, pd.StringDtype) and column.dtype.storage == "pyarrow"
+
+
+def extract_numbers(column: pd.Series, pattern: str) -> pd.DataFrame:
+    """
+    Найти первое совпадение регулярного выражения и вернуть его группы числами.
+    
+    Аргументы:
+        column: Текстовый столбец
+        pattern: Регулярное выражение с именованными группами (?P<имя>\\d+);
+            должно понимать и re, и RE2 (движок pyarrow); в RE2 \\s и \\d
+            совпадают только с ASCII-символами
+    
+    Возвращает:
+        DataFrame float-столбцов по именам групп (NaN — нет совпадения или пропуск)
+    """
+    if not _is_arrow(column):
+        return column.str.extract(pattern).astype(float)
+    
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    
+    matches = pc.extract_regex(pa.array(column.array), pattern)
+    return pd.DataFrame(
+        {
+            # struct_field учитывает пропуски самой структуры (нет совпадения)
+            matches.type.field(i).name: pc.cast(pc.struct_field(matches, [i]), pa.float64()).to_numpy(
+                zero_copy_only=False
+            )
+            for i in range(matches.type.num_fields)
+        },
+        index=column.index,
+    )
+
+
+def replace_text(column: pd.Series, old: str, new: str) -> pd.Series:
+    """Заменить подстроку без регулярных выражений."""
+    if not _is_arrow(column):
+        return column.str.replace(old, new, regex=False)
+    
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    
+    replaced = pc.replace_substring(pa.array(column.array), old, new)
+    return pd.Series(pd.arrays.ArrowStringArray(replaced), index=column.index, name=column.name)
+
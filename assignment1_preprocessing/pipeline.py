@@ -1,43 +1,234 @@
 """
-Пайплайн обработки данных с использованием паттерна "Цепочка ответственности".
+Пайплайн обработки данных на основе графа обработчиков.
 
-Координация последовательности обработчиков для преобразования сырых CSV-данных
-в чистые numpy-массивы, готовые для машинного обучения.
+Координация обработчиков для преобразования сырых CSV-данных в чистые
+numpy-массивы, готовые для машинного обучения. Порядок выполнения выводится
+из объявленных обработчиками входных и выходных столбцов (см. handler_graph.py).
 """
 
+import importlib.util
 import pandas as pd
 import numpy as np
+from pathlib import Path
+from handlers.currency import DEFAULT_RATES_PATH
 from handlers.salary_handler import SalaryHandler
 from handlers.age_handler import AgeHandler
 from handlers.experience_handler import ExperienceHandler
 from handlers.city_handler import CityHandler
+from handlers.city_encoder import CityEncoder
+from handlers.sketches import TopKSketch
 from handlers.final_handler import FinalHandler
+from handlers.predicates import RowPredicate
+from handler_graph import HandlerGraph
+
+
+# Размер порции при чтении с предикатами
+READ_CHUNKSIZE = 100_000
+
+
+# Текстовые столбцы читаются как string[pyarrow], если установлен pyarrow
+ARROW_STRINGS = importlib.util.find_spec("pyarrow") is not None
+
+
+def _parquet_module():
+    """pyarrow.parquet с понятной ошибкой, если pyarrow не установлен."""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Для чтения Parquet установите pyarrow: pip install pyarrow") from e
+    return pq
 
 
 class DataPipeline:
     """
     Основной класс пайплайна, управляющий обработкой данных.
     
-    Собирает и запускает цепочку обработчиков для трансформации данных.
+    Собирает граф обработчиков и запускает его: независимые обработчики
+    признаков выполняются параллельно, ненужные для выбранных признаков
+    обработчики пропускаются.
     """
     
-    def __init__(self) -> None:
-        """Инициализация пайплайна с построением цепочки обработчиков."""
-        self.final_handler = FinalHandler()
-        self.first_handler = SalaryHandler()
-        (self.first_handler
-         .set_next(AgeHandler())
-         .set_next(ExperienceHandler())
-         .set_next(CityHandler())
-         .set_next(self.final_handler))
+    def __init__(
+        self,
+        rates_path: str | Path = DEFAULT_RATES_PATH,
+        rates_date: str | None = None,
+        features: list[str] | None = None,
+        max_workers: int | None = None,
+        predicates: list[RowPredicate] | None = None,
+        city_top_k: int | None = 10,
+        city_min_frequency: int = 1,
+        city_buckets: int = 0,
+        city_encoder: CityEncoder | None = None,
+        arrow_strings: bool = ARROW_STRINGS
+    ) -> None:
+        """
+        Инициализация пайплайна с построением графа обработчиков.
+        
+        Аргументы:
+            rates_path: CSV-файл курсов валют для пересчёта зарплат
+            rates_date: Дата курсов (по умолчанию — самые свежие)
+            features: Признаки x_data (по умолчанию — возраст, опыт и города)
+            max_workers: Число параллельно выполняемых обработчиков
+                (1 — выполнять всё в текущем процессе)
+            predicates: Предикаты отбора строк. Предикаты над сырыми столбцами
+                применяются при чтении файла, остальные — сразу после
+                обработчика, создающего нужные им столбцы
+            city_top_k: Сколько самых частых городов кодировать отдельно
+            city_min_frequency: Минимальная частота города для попадания в словарь
+            city_buckets: Число корзин хеширования для прочих городов
+            city_encoder: Готовый кодировщик городов (например, из сохранённого
+                словаря); тогда словарь по данным не строится
+            arrow_strings: Читать текстовые столбцы как string[pyarrow]
+                (компактнее и быстрее object; по умолчанию — если есть pyarrow)
+        """
+        self.salary_handler = SalaryHandler(rates_path, rates_date)
+        self.age_handler = AgeHandler()
+        self.city_handler = CityHandler(
+            top_k=city_top_k,
+            min_frequency=city_min_frequency,
+            n_buckets=city_buckets,
+            encoder=city_encoder
+        )
+        # Готовый кодировщик из аргументов и кодировщик последнего запуска
+        self._fixed_city_encoder = city_encoder
+        self._city_encoder: CityEncoder | None = None
+        self.final_handler = FinalHandler(features)
+        feature_handlers = [self.age_handler, ExperienceHandler(), self.city_handler]
+        self.graph = HandlerGraph([self.salary_handler, *feature_handlers, self.final_handler], max_workers)
+        
+        # Предикаты над сырыми столбцами применяются при чтении, остальные — в графе
+        predicates = list(predicates or [])
+        self.read_predicates = [
+            p for p in predicates if not any(self.graph.produces(col) for col in p.inputs)
+        ]
+        graph_predicates = [p for p in predicates if p not in self.read_predicates]
+        if graph_predicates:
+            self.graph = HandlerGraph(
+                [self.salary_handler, *graph_predicates, *feature_handlers, self.final_handler],
+                max_workers
+            )
+        
+        # Читаются только сырые столбцы, нужные выполняемым обработчикам
+        levels = self.graph.plan(list(self.final_handler.inputs))
+        self.planned = [h for level in levels for h in level]
+        self.columns = self._raw_columns([*self.read_predicates, *self.planned])
+        # Первому проходу (summarize) нужны только фильтры строк и обработчики
+        # со скетчами — без тяжёлых текстовых столбцов вроде опыта работы
+        filters = [h for level in levels if all(h.filters_rows for h in level) for h in level]
+        sketched = [self.age_handler] if self.age_handler in self.planned else []
+        if self.city_handler in self.planned and city_encoder is None:
+            sketched.append(self.city_handler)
+        summary_columns = self._raw_columns([*self.read_predicates, *filters, *sketched])
+        self.summary_columns = [col for col in self.columns if col in summary_columns]
+        # Все читаемые сырые столбцы — текстовые
+        self.arrow_strings = arrow_strings
+        self.dtypes = {col: "string[pyarrow]" for col in self.columns} if arrow_strings else None
+    
+    def _raw_columns(self, handlers: list) -> list[str]:
+        """Сырые столбцы файла (не создаваемые графом), которые читают handlers."""
+        raw_inputs = [col for handler in handlers for col in handler.inputs if not self.graph.produces(col)]
+        return list(dict.fromkeys(raw_inputs))
+    
+    def _read_chunks(self, path: str | Path, chunksize: int, columns: list[str] | None = None):
+        """
+        Читать CSV или Parquet порциями, применяя предикаты при чтении.
+        
+        Читаются только столбцы columns (по умолчанию self.columns); строки,
+        отброшенные предикатами, не доходят до обработчиков.
+        """
+        path = Path(path)
+        columns = self.columns if columns is None else columns
+        if path.suffix.lower() == ".parquet":
+            pq = _parquet_module()
+            batches = pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns)
+            chunks = (self._to_pandas(batch) for batch in batches)
+        else:
+            dtypes = {col: self.dtypes[col] for col in columns} if self.dtypes else None
+            chunks = pd.read_csv(path, chunksize=chunksize, usecols=columns, dtype=dtypes)
+        
+        for chunk in chunks:
+            for predicate in self.read_predicates:
+                rows_in = len(chunk)
+                chunk = predicate.handle(chunk)
+                stats = self.graph.filter_stats.setdefault(f"{predicate.name} (при чтении)", [0, 0])
+                stats[0] += rows_in
+                stats[1] += len(chunk)
+            yield chunk
+    
+    def _to_pandas(self, table) -> pd.DataFrame:
+        """Arrow-таблица или пакет строк → DataFrame (строки без копирования в объекты Python)."""
+        if not self.arrow_strings:
+            return table.to_pandas()
+        import pyarrow as pa
+        string_types = {pa.string(): pd.StringDtype("pyarrow"), pa.large_string(): pd.StringDtype("pyarrow")}
+        return table.to_pandas(types_mapper=string_types.get)
+    
+    def read(self, path: str | Path) -> pd.DataFrame:
+        """
+        Прочитать сырые столбцы, нужные пайплайну, с предикатами при чтении.
+        
+        Файл читается целиком; с предикатами — порциями, без лишних строк в памяти.
+        
+        Аргументы:
+            path: Путь к CSV- или Parquet-файлу
+        
+        Возвращает:
+            DataFrame столбцов self.columns (текст — string[pyarrow] при arrow_strings)
+        """
+        if not self.read_predicates:
+            if Path(path).suffix.lower() == ".parquet":
+                return self._to_pandas(_parquet_module().read_table(path, columns=self.columns))
+            # Без порций CSV разбирает многопоточный парсер pyarrow
+            engine = "pyarrow" if self.arrow_strings else "c"
+            return pd.read_csv(path, usecols=self.columns, dtype=self.dtypes, engine=engine)
+        chunks = list(self._read_chunks(path, READ_CHUNKSIZE))
+        if not chunks:
+            return pd.DataFrame(columns=self.columns)
+        return pd.concat(chunks) if len(chunks) > 1 else chunks[0]
+    
+    @property
+    def feature_names(self) -> list[str] | None:
+        """Имена столбцов x_data последнего запуска (схема признаков)."""
+        return self.final_handler.feature_names
+    
+    @property
+    def city_encoder(self) -> CityEncoder | None:
+        """Кодировщик городов последнего запуска (для сохранения словаря)."""
+        return self._city_encoder
+    
+    def _set_city_encoder(self, summary: TopKSketch | None) -> None:
+        """
+        Зафиксировать словарь городов до запуска графа.
+        
+        Кодировщик строится в текущем процессе и передаётся обработчику
+        готовым, поэтому словарь одинаков для всех порций и доступен
+        через city_encoder, даже если handle() выполняется в пуле процессов.
+        """
+        self._city_encoder = None
+        if self.city_handler not in self.planned:
+            return
+        if self._fixed_city_encoder is not None:
+            self._city_encoder = self._fixed_city_encoder
+        elif summary is not None:
+            self._city_encoder = self.city_handler.fit_encoder(summary)
+        self.city_handler.encoder = self._city_encoder
+    
+    def filter_report(self) -> list[tuple[str, int, int]]:
+        """
+        Сколько строк отбросила каждая стадия отбора последнего запуска.
+        
+        Возвращает:
+            Список (стадия, строк на входе, строк на выходе) в порядке применения
+        """
+        return [(name, rows_in, rows_out) for name, (rows_in, rows_out) in self.graph.filter_stats.items()]
     
-    def process(self, csv_path: str) -> tuple[np.ndarray, np.ndarray]:
+    def process(self, csv_path: str | Path) -> tuple[np.ndarray, np.ndarray]:
         """
         Выполнить полную обработку данных через пайплайн.
         
         Аргументы:
-            csv_path: Путь к входному CSV-файлу
-            
+            csv_path: Путь к входному CSV- или Parquet-файлу
+        
         Возвращает:
             Кортеж из (x_data, y_data) numpy-массивов
             
@@ -45,6 +236,100 @@ class DataPipeline:
             FileNotFoundError: Если CSV-файл не найден
             pd.errors.ParserError: При ошибке парсинга CSV
         """
-        df = pd.read_csv(csv_path)
-        df = self.first_handler.process(df)
-        return self.final_handler.get_outputs()
\ No newline at end of file
+        self.graph.filter_stats.clear()
+        df = self.graph.run(self.read(csv_path), filters_only=True)
+        city_summary = None
+        if self.city_handler in self.planned and self._fixed_city_encoder is None:
+            city_summary = self.city_handler.summarize(df)
+        self._set_city_encoder(city_summary)
+        try:
+            self.graph.run(df, list(self.final_handler.inputs), skip_filters=True)
+        finally:
+            self.city_handler.encoder = self._fixed_city_encoder
+        return self.final_handler.get_outputs()
+    
+    def summarize(self, csv_path: str | Path, chunksize: int = 100_000) -> tuple:
+        """
+        Первый проход: построить скетчи медианы возраста и частот городов.
+        
+        Скетчи разных файлов или порций объединяются через merge().
+        Читаются только столбцы self.summary_columns.
+        
+        Аргументы:
+            csv_path: Путь к входному CSV- или Parquet-файлу
+            chunksize: Число строк в одной порции
+        
+        Возвращает:
+            Кортеж (скетч возраста, скетч городов); None для невыполняемого обработчика и для городов при готовом словаре
+        """
+        age_summary = city_summary = None
+        # Строки без курса валюты попадут в лог на втором проходе, не дважды
+        currency_table = self.salary_handler.currency_table
+        currency_table.warn_missing_rates = False
+        try:
+            for chunk in self._read_chunks(csv_path, chunksize, self.summary_columns):
+                chunk = self.graph.run(chunk, filters_only=True)
+                if self.age_handler in self.planned:
+                    age_part = self.age_handler.summarize(chunk)
+                    age_summary = age_part if age_summary is None else age_summary.merge(age_part)
+                # С готовым словарём частоты городов не нужны
+                if self.city_handler in self.planned and self._fixed_city_encoder is None:
+                    city_part = self.city_handler.summarize(chunk)
+                    city_summary = city_part if city_summary is None else city_summary.merge(city_part)
+        finally:
+            currency_table.warn_missing_rates = True
+        return age_summary, city_summary
+    
+    def transform(self, csv_path: str | Path, summaries: tuple, chunksize: int = 100_000) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Второй проход: обработать файл порциями с заданными (глобальными) скетчами.
+        
+        Аргументы:
+            csv_path: Путь к входному CSV- или Parquet-файлу
+            summaries: Кортеж скетчей из summarize() (возможно, объединённых)
+            chunksize: Число строк в одной порции
+        
+        Возвращает:
+            Кортеж из (x_data, y_data) numpy-массивов
+        """
+        age_summary, city_summary = summaries
+        self.age_handler.set_summary(age_summary)
+        self._set_city_encoder(city_summary)
+        try:
+            x_parts, y_parts = [], []
+            for chunk in self._read_chunks(csv_path, chunksize):
+                self.graph.run(chunk, list(self.final_handler.inputs))
+                x_data, y_data = self.final_handler.get_outputs()
+                x_parts.append(x_data)
+                y_parts.append(y_data)
+        finally:
+            self.age_handler.set_summary(None)
+            self.city_handler.encoder = self._fixed_city_encoder
+        if not x_parts:
+            return np.empty((0, 0)), np.empty(0)
+        return np.concatenate(x_parts), np.concatenate(y_parts)
+    
+    def process_chunked(self, csv_path: str | Path, chunksize: int = 100_000) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Обработать CSV порциями, не загружая его в память целиком.
+        
+        Первый проход строит по каждой порции частичные скетчи медианы возраста
+        и частот городов и объединяет их; второй проход обрабатывает порции
+        графом с общими (глобальными) скетчами, поэтому все порции получают
+        одинаковую медиану и одинаковый набор столбцов city_*.
+        
+        Аргументы:
+            csv_path: Путь к входному CSV- или Parquet-файлу
+            chunksize: Число строк в одной порции
+        
+        Возвращает:
+            Кортеж из (x_data, y_data) numpy-массивов
+        """
+        summaries = self.summarize(csv_path, chunksize)
+        # Статистики отбора — только по второму проходу
+        self.graph.filter_stats.clear()
+        return self.transform(csv_path, summaries, chunksize)
+    
+    def close(self) -> None:
+        """Освободить пулы потоков и процессов графа."""
+        self.graph.close()
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""
+Параллельная обработка выгрузки, разбитой на много файлов-шардов.
+
+Шарды задаются путями, glob-шаблонами или каталогами; поддерживаются CSV
+(в том числе сжатые gzip, bz2, xz и zstd — распаковка по расширению) и Parquet.
+Каждый шард читается, распаковывается и разбирается в рабочем процессе пула,
+поэтому чтение одних шардов идёт одновременно с разбором других.
+
+Обработка в два прохода, как в DataPipeline.process_chunked():
+1. Шарды независимо строят скетчи медианы возраста и частот городов,
+   главный процесс объединяет их через merge(); читаются только столбцы
+   фильтров, возраста и города (DataPipeline.summary_columns)
+2. Шарды обрабатываются с общими скетчами, массивы признаков склеиваются
+   в порядке шардов в один x_data/y_data
+"""
+
+import os
+import glob
+import logging
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from pipeline import DataPipeline
+from handlers.city_encoder import CityEncoder
+
+
+logger = logging.getLogger(__name__)
+
+# Расширения файлов, которые берутся из каталогов
+SHARD_SUFFIXES = (".csv", ".csv.gz", ".csv.bz2", ".csv.xz", ".csv.zst", ".parquet")
+
+# Пайплайн рабочего процесса (создаётся один раз в _init_worker)
+_worker_pipeline: DataPipeline | None = None
+
+
+def resolve_inputs(inputs: list[str | Path]) -> list[Path]:
+    """
+    Развернуть пути, glob-шаблоны и каталоги в отсортированный список шардов.
+    
+    Аргументы:
+        inputs: Пути к файлам, шаблоны ("shards/*.csv.gz") или каталоги
+    
+    Возвращает:
+        Список файлов без повторов, в порядке аргументов и по имени внутри каждого
+    
+    Вызывает:
+        FileNotFoundError: Если аргумент не соответствует ни одному файлу
+    """
+    paths = []
+    for item in inputs:
+        item = str(item)
+        if os.path.isdir(item):
+            found = sorted(
+                p for p in Path(item).iterdir()
+                if p.is_file() and p.name.lower().endswith(SHARD_SUFFIXES)
+            )
+        elif glob.has_magic(item):
+            found = sorted(Path(p) for p in glob.glob(item, recursive=True) if os.path.isfile(p))
+        else:
+            found = [Path(item)] if os.path.isfile(item) else []
+        if not found:
+            raise FileNotFoundError(f"Нет файлов для: {item}")
+        paths += found
+    return list(dict.fromkeys(paths))
+
+
+def _merge(left, right):
+    """Объединить два скетча (любой может быть None)."""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    return left.merge(right)
+
+
+def _init_worker(pipeline_kwargs: dict) -> None:
+    """Собрать пайплайн в рабочем процессе пула."""
+    global _worker_pipeline
+    _worker_pipeline = DataPipeline(**pipeline_kwargs, max_workers=1)
+
+
+def _summarize_shard(path: Path, chunksize: int) -> tuple:
+    """Первый проход по шарду в рабочем процессе."""
+    return _worker_pipeline.summarize(path, chunksize)
+
+
+def _transform_shard(path: Path, summaries: tuple, chunksize: int) -> tuple:
+    """Второй проход по шарду: массивы признаков, их схема, кодировщик городов и статистика отбора строк."""
+    _worker_pipeline.graph.filter_stats.clear()
+    x_data, y_data = _worker_pipeline.transform(path, summaries, chunksize)
+    return (
+        x_data,
+        y_data,
+        _worker_pipeline.feature_names,
+        _worker_pipeline.city_encoder,
+        dict(_worker_pipeline.graph.filter_stats)
+    )
+
+
+class ShardedPipeline:
+    """
+    Обработка многих шардов пулом процессов с объединением в одно хранилище признаков.
+    
+    Время работы определяется числом ядер и скоростью диска, а не числом
+    шардов: одновременно обрабатывается до workers шардов. При workers=1
+    всё выполняется в текущем процессе без пула.
+    """
+    
+    def __init__(self, workers: int | None = None, chunksize: int = 100_000, **pipeline_kwargs) -> None:
+        """
+        Аргументы:
+            workers: Число рабочих процессов (по умолчанию — число ядер)
+            chunksize: Число строк в одной порции при чтении шарда
+            **pipeline_kwargs: Аргументы DataPipeline (rates_path, features, predicates, ...)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.pipeline_kwargs = pipeline_kwargs
+        # Имя стадии отбора → [строк на входе, строк на выходе] по всем шардам
+        self.filter_stats: dict[str, list[int]] = {}
+        # Имена столбцов x_data последнего запуска (общие для всех шардов)
+        self.feature_names: list[str] | None = None
+        # Кодировщик городов последнего запуска (один словарь для всех шардов)
+        self.city_encoder: CityEncoder | None = None
+    
+    def filter_report(self) -> list[tuple[str, int, int]]:
+        """То же, что DataPipeline.filter_report(), суммарно по всем шардам."""
+        return [(name, rows_in, rows_out) for name, (rows_in, rows_out) in self.filter_stats.items()]
+    
+    def _map(self, executor: ProcessPoolExecutor | None, fn, paths: list[Path], *args) -> list:
+        """Выполнить fn для каждого шарда, сохраняя порядок результатов."""
+        if executor is None:
+            return [fn(path, *args) for path in paths]
+        futures = [executor.submit(fn, path, *args) for path in paths]
+        return [f.result() for f in futures]
+    
+    def process(self, inputs: list[str | Path]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Обработать все шарды и склеить результат.
+        
+        Аргументы:
+            inputs: Пути, glob-шаблоны или каталоги (см. resolve_inputs)
+        
+        Возвращает:
+            Кортеж из (x_data, y_data) numpy-массивов по всем шардам
+        
+        Вызывает:
+            FileNotFoundError: Если для какого-либо аргумента нет файлов
+            ValueError: Если после отбора не осталось ни одной строки
+                или шарды дали разные наборы столбцов
+        """
+        paths = resolve_inputs(inputs)
+        workers = min(self.workers, len(paths))
+        logger.info(f"Шардов: {len(paths)}, рабочих процессов: {workers}")
+        
+        executor = None
+        if workers > 1:
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(self.pipeline_kwargs,)
+            )
+        else:
+            _init_worker(self.pipeline_kwargs)
+        try:
+            age_summary = city_summary = None
+            for age_part, city_part in self._map(executor, _summarize_shard, paths, self.chunksize):
+                age_summary = _merge(age_summary, age_part)
+                city_summary = _merge(city_summary, city_part)
+            
+            results = self._map(
+                executor, _transform_shard, paths, (age_summary, city_summary), self.chunksize
+            )
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        
+        self.filter_stats = {}
+        self.feature_names = None
+        self.city_encoder = None
+        x_parts, y_parts = [], []
+        for path, (x_data, y_data, feature_names, city_encoder, stats) in zip(paths, results):
+            logger.debug(f"{path}: {len(y_data)} строк")
+            for name, (rows_in, rows_out) in stats.items():
+                total = self.filter_stats.setdefault(name, [0, 0])
+                total[0] += rows_in
+                total[1] += rows_out
+            if len(y_data):
+                if self.feature_names is not None and feature_names != self.feature_names:
+                    raise ValueError(f"Схема признаков шарда {path} отличается от предыдущих: {feature_names}")
+                self.feature_names = feature_names
+                self.city_encoder = city_encoder
+                x_parts.append(x_data)
+                y_parts.append(y_data)
+        if not y_parts:
+            raise ValueError("После отбора строк не осталось данных ни в одном шарде")
+        return np.concatenate(x_parts), np.concatenate(y_parts)
@@ -13,7 +13,7 @@ import sys
 import logging
 import numpy as np
 from pathlib import Path
-from model import LinearRegressionModel
+from model import LinearRegressionModel, load_feature_names
 
 
 logging.basicConfig(
@@ -59,6 +59,7 @@ def main() -> None:
     # Загрузка данных
     try:
         X = np.load(x_path)
+        feature_names = load_feature_names(x_path)
     except Exception as e:
         logger.error(f"Ошибка загрузки данных: {e}")
         sys.exit(1)
@@ -74,7 +75,7 @@ def main() -> None:
     
     # Предсказание и вывод РЕЗУЛЬТАТА в stdout (только числа!)
     try:
-        y_pred = model.predict(X)
+        y_pred = model.predict(X, feature_names)
         for salary in y_pred:
             print(f"{salary:.2f}")
     except Exception as e:
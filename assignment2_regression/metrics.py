@@ -0,0 +1,121 @@
+"""
+Потоковые метрики регрессии с бутстреп-доверительными интервалами.
+
+RegressionMetrics накапливает достаточные статистики (Σ1, Σy, Σy², Σe², Σ|e|)
+за один проход по данным, порциями любого размера; накопители разных порций
+или процессов объединяются через merge(). MSE, RMSE, MAE и R² считаются
+из этих сумм без повторного прохода по массивам.
+
+Доверительные интервалы — пуассоновский бутстреп: каждая строка входит
+в каждую бутстреп-выборку с весом Poisson(1). Веса генерируются на лету
+для каждого блока строк, и суммы всех выборок считаются одним матричным
+умножением, поэтому бутстреп тоже не требует повторного прохода.
+"""
+
+import numpy as np
+
+
+DEFAULT_BOOTSTRAP = 200
+_STATS = ("n", "sum_y", "sum_y2", "sum_e2", "sum_abs_e")
+
+
+class RegressionMetrics:
+    """Объединяемый накопитель метрик регрессии."""
+    
+    def __init__(self, n_bootstrap: int = DEFAULT_BOOTSTRAP, seed: int | None = 42, block_size: int = 8192) -> None:
+        """
+        Аргументы:
+            n_bootstrap: Число бутстреп-выборок (0 — без доверительных интервалов)
+            seed: Зерно генератора весов; накопители, которые потом
+                объединяются, должны получать разные seed
+            block_size: Число строк, для которых веса генерируются за раз
+        """
+        self.n_bootstrap = n_bootstrap
+        self.block_size = block_size
+        self._rng = np.random.default_rng(seed)
+        # Строка 0 — исходная выборка, строки 1.. — бутстреп-выборки
+        self._sums = np.zeros((1 + n_bootstrap, len(_STATS)))
+        # Сдвиг y для численной устойчивости R² (среднее первой порции)
+        self._shift: float | None = None
+    
+    def update(self, y_true: np.ndarray, y_pred: np.ndarray) -> "RegressionMetrics":
+        """Добавить порцию истинных и предсказанных значений."""
+        y_true = np.asarray(y_true, dtype=float).ravel()
+        y_pred = np.asarray(y_pred, dtype=float).ravel()
+        if len(y_true) != len(y_pred):
+            raise ValueError(f"Разная длина y_true ({len(y_true)}) и y_pred ({len(y_pred)})")
+        if len(y_true) == 0:
+            return self
+        if self._shift is None:
+            self._shift = float(y_true.mean())
+        
+        for start in range(0, len(y_true), self.block_size):
+            y = y_true[start:start + self.block_size] - self._shift
+            e = y_pred[start:start + self.block_size] - self._shift - y
+            columns = np.column_stack([np.ones_like(y), y, y * y, e * e, np.abs(e)])
+            weights = np.ones((1 + self.n_bootstrap, len(y)))
+            weights[1:] = self._rng.poisson(1.0, (self.n_bootstrap, len(y)))
+            self._sums += weights @ columns
+        return self
+    
+    def merge(self, other: "RegressionMetrics") -> "RegressionMetrics":
+        """Объединить с накопителем другой порции данных (на месте)."""
+        if other.n_bootstrap != self.n_bootstrap:
+            raise ValueError("Нельзя объединить накопители с разным числом бутстреп-выборок")
+        if other._shift is None:
+            return self
+        if self._shift is None:
+            self._shift = other._shift
+            self._sums = other._sums.copy()
+            return self
+        # Переводим суммы другого накопителя к нашему сдвигу: y' = y + d
+        d = other._shift - self._shift
+        n, sum_y, sum_y2, sum_e2, sum_abs_e = other._sums.T
+        shifted = np.column_stack([n, sum_y + n * d, sum_y2 + 2 * d * sum_y + n * d * d, sum_e2, sum_abs_e])
+        self._sums += shifted
+        return self
+    
+    @staticmethod
+    def _metrics(sums: np.ndarray) -> dict[str, np.ndarray]:
+        """Метрики по строкам массива сумм (векторно для всех выборок)."""
+        n, sum_y, sum_y2, sum_e2, sum_abs_e = sums.T
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mse = sum_e2 / n
+            ss_tot = sum_y2 - sum_y * sum_y / n
+            return {
+                "mse": mse,
+                "rmse": np.sqrt(mse),
+                "mae": sum_abs_e / n,
+                "r2": 1 - sum_e2 / ss_tot,
+            }
+    
+    def compute(self) -> dict[str, float]:
+        """
+        Метрики по всем добавленным данным.
+        
+        Возвращает:
+            Словарь n, mse, rmse, mae, r2
+        """
+        metrics = {name: float(values[0]) for name, values in self._metrics(self._sums[:1]).items()}
+        return {"n": int(self._sums[0, 0]), **metrics}
+    
+    def confidence_intervals(self, level: float = 0.95) -> dict[str, tuple[float, float]]:
+        """
+        Перцентильные бутстреп-интервалы метрик.
+        
+        Аргументы:
+            level: Уровень доверия
+        
+        Возвращает:
+            Словарь метрика → (нижняя граница, верхняя граница)
+        
+        Вызывает:
+            RuntimeError: Если накопитель создан с n_bootstrap=0
+        """
+        if self.n_bootstrap == 0:
+            raise RuntimeError("Доверительные интервалы требуют n_bootstrap > 0")
+        alpha = (1 - level) / 2
+        return {
+            name: tuple(float(q) for q in np.nanquantile(values, [alpha, 1 - alpha]))
+            for name, values in self._metrics(self._sums[1:]).items()
+        }
\ No newline at end of file
@@ -2,22 +2,115 @@
 Модуль линейной регрессии.
 
 Реализует линейную регрессию с сохранением и загрузкой весов.
-Использует нормальное уравнение для обучения без итераций.
+fit() решает нормальное уравнение за один проход по всем данным;
+partial_fit() дообучает модель мини-батчами (SGD или Adam, L2 по желанию)
+на порции новых данных за время, пропорциональное размеру порции.
+
+Модель хранится одним версионированным файлом (ARTIFACT_NAME):
+    8 байт   — сигнатура ARTIFACT_MAGIC
+    8 байт   — длина заголовка (uint64, little-endian)
+    заголовок — JSON: версия формата, версия модели, dtype, схема признаков,
+               статистики обучения
+    данные   — [bias, *weights] в float64 (little-endian), выровнены по 64 байтам
+
+Состояние онлайн-обучения (масштабы признаков, моменты Adam, число шагов)
+хранится в заголовке под ключом "online": загрузчики, которые о нём
+не знают, его игнорируют, и app.py предсказывает по тем же весам.
+
+Загрузка — одно открытие файла и mmap: параметры читаются без копирования,
+поэтому процессы, загрузившие один файл, делят одни страницы памяти.
 """
 
+import os
+import json
+import mmap
+import hashlib
 import numpy as np
+from datetime import datetime, timezone
 from pathlib import Path
 
 
+ARTIFACT_NAME = "model.bin"
+ARTIFACT_MAGIC = b"LINREG\x00\x00"
+FORMAT_VERSION = 1
+PARAMS_DTYPE = "<f8"
+_ALIGNMENT = 64
+OPTIMIZERS = ("sgd", "adam")
+# Схема признаков лежит рядом с матрицей: x_data.npy → x_data.features.json
+# (то же правило, по которому её записывает задание №1)
+FEATURES_SUFFIX = ".features.json"
+
+
+def _data_offset(header_len: int) -> int:
+    """Смещение массива параметров: сразу после заголовка, с выравниванием."""
+    return -(-(16 + header_len) // _ALIGNMENT) * _ALIGNMENT
+
+
+def feature_names_path(x_path: str | Path) -> Path:
+    """Путь к схеме признаков матрицы x_path (x_*.npy → x_*.features.json)."""
+    return Path(x_path).with_suffix(FEATURES_SUFFIX)
+
+
+def load_feature_names(x_path: str | Path) -> list[str] | None:
+    """
+    Прочитать схему признаков, сохранённую заданием №1 рядом с x_path.
+    
+    Аргументы:
+        x_path: Путь к матрице признаков x_*.npy
+    
+    Возвращает:
+        Имена столбцов по порядку или None, если схемы нет
+    """
+    try:
+        with open(feature_names_path(x_path), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
 class LinearRegressionModel:
     """Класс линейной регрессии с ручным управлением весами."""
     
-    def __init__(self) -> None:
-        """Инициализация модели с пустыми весами."""
+    def __init__(
+        self,
+        optimizer: str = "adam",
+        learning_rate: float = 0.01,
+        l2: float = 0.0,
+        batch_size: int = 256,
+        seed: int | None = 42
+    ) -> None:
+        """
+        Инициализация модели с пустыми весами.
+        
+        Аргументы (используются только partial_fit):
+            optimizer: "sgd" или "adam"
+            learning_rate: Начальный шаг; убывает как 1/√(1 + шаг/1000)
+            l2: Коэффициент L2-регуляризации весов (в стандартизованных признаках)
+            batch_size: Размер мини-батча
+            seed: Зерно перемешивания строк внутри порции
+        
+        Вызывает:
+            ValueError: Если оптимизатор неизвестен
+        """
+        if optimizer not in OPTIMIZERS:
+            raise ValueError(f"Неизвестный оптимизатор: {optimizer} (доступны {', '.join(OPTIMIZERS)})")
         self.weights = None
         self.bias = 0.0
+        # Имена признаков в порядке столбцов X (из задания №1), None — неизвестны
+        self.feature_names: list[str] | None = None
+        self.train_stats: dict = {}
+        self.version: str | None = None
+        self.optimizer = optimizer
+        self.learning_rate = learning_rate
+        self.l2 = l2
+        self.batch_size = batch_size
+        self._rng = np.random.default_rng(seed)
+        # Состояние онлайн-обучения (см. _init_online), None — partial_fit не вызывался
+        self._online: dict | None = None
+        # Средняя стандартизованная ошибка последнего вызова partial_fit (половина MSE + L2)
+        self.last_loss: float | None = None
     
-    def fit(self, X: np.ndarray, y: np.ndarray) -> None:
+    def fit(self, X: np.ndarray, y: np.ndarray, feature_names: list[str] | None = None) -> None:
         """
         Обучить модель методом наименьших квадратов.
         
@@ -26,60 +119,321 @@ class LinearRegressionModel:
         Аргументы:
             X: Матрица признаков (n_samples, n_features)
             y: Вектор целевой переменной (n_samples,)
+            feature_names: Имена столбцов X (сохраняются в артефакт и
+                проверяются при предсказании)
+        
+        Вызывает:
+            ValueError: Если число имён не совпадает с числом столбцов X
         """
+        if feature_names is not None and len(feature_names) != X.shape[1]:
+            raise ValueError(f"Имён признаков {len(feature_names)}, а столбцов X — {X.shape[1]}")
         x_b = np.c_[np.ones((X.shape[0], 1)), X]
         theta = np.linalg.inv(x_b.T.dot(x_b)).dot(x_b.T).dot(y)
         self.bias = theta[0]
         self.weights = theta[1:]
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self.train_stats = {"n_samples": int(X.shape[0])}
+        self.version = None
+        self._online = None
     
-    def predict(self, X: np.ndarray) -> np.ndarray:
+    def _init_online(self, X: np.ndarray, y: np.ndarray) -> None:
+        """
+        Подготовить онлайн-обучение по первой порции данных.
+        
+        Оптимизация идёт в стандартизованных признаках и цели (средние
+        и масштабы берутся из первой порции и дальше не меняются),
+        поэтому один шаг обучения подходит для признаков любого масштаба.
+        Если модель уже обучена (fit() или load()), обучение продолжается
+        с её весов.
+        """
+        x_mean = X.mean(axis=0)
+        x_scale = X.std(axis=0)
+        x_scale[x_scale == 0] = 1.0
+        y_mean = float(y.mean())
+        y_scale = float(y.std()) or 1.0
+        theta = np.zeros(X.shape[1] + 1)
+        if self.weights is not None:
+            # w = σy·θ/σx, b = μy + σy·θ0 − w·μx
+            theta[1:] = np.asarray(self.weights) * x_scale / y_scale
+            theta[0] = (self.bias - y_mean + np.dot(self.weights, x_mean)) / y_scale
+        self._online = {
+            "x_mean": x_mean,
+            "x_scale": x_scale,
+            "y_mean": y_mean,
+            "y_scale": y_scale,
+            "theta": theta,
+            "m": np.zeros_like(theta),
+            "v": np.zeros_like(theta),
+            "step": 0,
+            "n_seen": 0,
+        }
+    
+    def _sync_weights(self) -> None:
+        """Пересчитать weights и bias в исходных единицах из стандартизованных параметров."""
+        state = self._online
+        theta = state["theta"]
+        self.weights = state["y_scale"] * theta[1:] / state["x_scale"]
+        self.bias = float(state["y_mean"] + state["y_scale"] * theta[0] - np.dot(self.weights, state["x_mean"]))
+    
+    def partial_fit(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        feature_names: list[str] | None = None,
+        epochs: int = 1
+    ) -> "LinearRegressionModel":
+        """
+        Дообучить модель на порции данных мини-батчами.
+        
+        Время работы пропорционально размеру порции: прежние данные
+        не перечитываются. Порции можно подавать из np.load(..., mmap_mode="r").
+        
+        Аргументы:
+            X: Матрица признаков порции (n_samples, n_features)
+            y: Вектор целевой переменной порции (n_samples,)
+            feature_names: Имена столбцов X (проверяются по схеме модели)
+            epochs: Число проходов по порции
+        
+        Возвращает:
+            Эту же модель
+        
+        Вызывает:
+            ValueError: Если X не соответствует схеме признаков модели
+        """
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y, dtype=float).ravel()
+        if len(X) != len(y):
+            raise ValueError(f"Разная длина X ({len(X)}) и y ({len(y)})")
+        if len(y) == 0:
+            return self
+        if self.weights is not None:
+            self.check_schema(X, feature_names)
+        elif feature_names is not None and len(feature_names) != X.shape[1]:
+            raise ValueError(f"Имён признаков {len(feature_names)}, а столбцов X — {X.shape[1]}")
+        if feature_names is not None:
+            self.feature_names = list(feature_names)
+        if self._online is None:
+            self._init_online(X, y)
+        
+        state = self._online
+        x_std = (X - state["x_mean"]) / state["x_scale"]
+        y_std = (y - state["y_mean"]) / state["y_scale"]
+        theta, m, v = state["theta"], state["m"], state["v"]
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+        total_loss = 0.0
+        for _ in range(epochs):
+            total_loss = 0.0
+            order = self._rng.permutation(len(y_std))
+            for start in range(0, len(order), self.batch_size):
+                batch = order[start:start + self.batch_size]
+                xb, yb = x_std[batch], y_std[batch]
+                residual = xb @ theta[1:] + theta[0] - yb
+                grad = np.empty_like(theta)
+                grad[0] = residual.mean()
+                grad[1:] = xb.T @ residual / len(batch) + self.l2 * theta[1:]
+                penalty = 0.5 * self.l2 * float(theta[1:] @ theta[1:])
+                total_loss += 0.5 * float(residual @ residual) + penalty * len(batch)
+                
+                state["step"] += 1
+                lr = self.learning_rate / np.sqrt(1.0 + state["step"] / 1000)
+                if self.optimizer == "adam":
+                    m *= beta1
+                    m += (1 - beta1) * grad
+                    v *= beta2
+                    v += (1 - beta2) * grad * grad
+                    m_hat = m / (1 - beta1 ** state["step"])
+                    v_hat = v / (1 - beta2 ** state["step"])
+                    theta -= lr * m_hat / (np.sqrt(v_hat) + eps)
+                else:
+                    theta -= lr * grad
+        
+        state["n_seen"] += len(y)
+        self.last_loss = total_loss / len(y)
+        self._sync_weights()
+        # Строк, пройденных partial_fit, с повторами по эпохам; число различных
+        # строк (n_samples) partial_fit не знает — его записывает вызывающий код
+        self.train_stats = {**self.train_stats, "n_seen": int(state["n_seen"])}
+        self.version = None
+        return self
+    
+    @property
+    def has_online_state(self) -> bool:
+        """Обучалась ли модель мини-батчами (есть состояние partial_fit)."""
+        return self._online is not None
+    
+    def check_schema(self, X: np.ndarray, feature_names: list[str] | None = None) -> None:
+        """
+        Проверить, что X соответствует схеме признаков модели.
+        
+        Число столбцов проверяется всегда; имена — если они известны
+        и модели, и вызывающему коду.
+        
+        Вызывает:
+            ValueError: При несовпадении числа, порядка или имён столбцов
+        """
+        if X.ndim != 2 or X.shape[1] != len(self.weights):
+            raise ValueError(
+                f"Ожидалась матрица из {len(self.weights)} признаков, получена форма {X.shape}"
+            )
+        if feature_names is None or self.feature_names is None:
+            return
+        feature_names = list(feature_names)
+        if feature_names != self.feature_names:
+            missing = [name for name in self.feature_names if name not in feature_names]
+            extra = [name for name in feature_names if name not in self.feature_names]
+            detail = f"нет {missing}, лишние {extra}" if missing or extra else "другой порядок столбцов"
+            raise ValueError(f"Схема признаков не совпадает с моделью: {detail}")
+    
+    def predict(self, X: np.ndarray, feature_names: list[str] | None = None) -> np.ndarray:
         """
         Предсказать зарплаты по признакам.
         
         Аргументы:
             X: Матрица признаков (n_samples, n_features)
-            
+            feature_names: Имена столбцов X для проверки схемы (необязательно)
+        
         Возвращает:
             Вектор предсказанных зарплат (n_samples,)
             
         Вызывает:
             RuntimeError: Если модель не обучена
+            ValueError: Если X не соответствует схеме признаков модели
         """
         if self.weights is None:
             raise RuntimeError("Модель не обучена. Сначала вызовите метод fit().")
+        self.check_schema(X, feature_names)
         return X.dot(self.weights) + self.bias
     
-    def save(self, resources_dir: str | Path) -> None:
+    def save(self, resources_dir: str | Path, train_stats: dict | None = None) -> Path:
         """
-        Сохранить веса модели в папку resources/.
+        Сохранить модель одним файлом в папку resources/.
+        
+        Файл записывается во временный и атомарно заменяет прежний,
+        поэтому читающие процессы никогда не видят его частично записанным.
         
         Аргументы:
-            resources_dir: Путь к папке для сохранения весов
+            resources_dir: Путь к папке для сохранения модели
+            train_stats: Статистики обучения для заголовка (метрики, фильтры и т.п.)
+        
+        Возвращает:
+            Путь к файлу модели
         """
         resources_dir = Path(resources_dir)
         resources_dir.mkdir(exist_ok=True)
-        np.save(resources_dir / "weights.npy", self.weights)
-        np.save(resources_dir / "bias.npy", np.array([self.bias]))
+        if train_stats:
+            self.train_stats = {**self.train_stats, **train_stats}
+        
+        params = np.concatenate([[self.bias], self.weights]).astype(PARAMS_DTYPE)
+        self.version = (
+            datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+            + "-" + hashlib.sha256(params.tobytes()).hexdigest()[:8]
+        )
+        header = {
+            "format_version": FORMAT_VERSION,
+            "model_version": self.version,
+            "dtype": PARAMS_DTYPE,
+            "n_features": len(self.weights),
+            "feature_names": self.feature_names,
+            "train_stats": self.train_stats,
+        }
+        if self._online is not None:
+            header["online"] = self._online_header()
+        header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        padding = _data_offset(len(header_bytes)) - 16 - len(header_bytes)
+        
+        path = resources_dir / ARTIFACT_NAME
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(ARTIFACT_MAGIC)
+            f.write(len(header_bytes).to_bytes(8, "little"))
+            f.write(header_bytes)
+            f.write(b" " * padding)
+            f.write(params.tobytes())
+        os.replace(tmp_path, path)
+        return path
     
     def load(self, resources_dir: str | Path) -> None:
         """
-        Загрузить веса модели из папки resources/.
+        Загрузить модель из папки resources/ (или из файла модели).
         
         Аргументы:
-            resources_dir: Путь к папке с весами
-            
+            resources_dir: Путь к папке с моделью или к самому файлу
+        
         Вызывает:
-            FileNotFoundError: Если файлы весов не найдены
+            FileNotFoundError: Если файл модели не найден
+            ValueError: Если файл повреждён или записан более новой версией формата
         """
-        resources_dir = Path(resources_dir)
-        weights_path = resources_dir / "weights.npy"
-        bias_path = resources_dir / "bias.npy"
-        
-        if not weights_path.exists() or not bias_path.exists():
+        path = Path(resources_dir)
+        if path.suffix != Path(ARTIFACT_NAME).suffix:
+            path = path / ARTIFACT_NAME
+        try:
+            with open(path, "rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
             raise FileNotFoundError(
-                f"Файлы весов не найдены в {resources_dir}. "
-                "Сначала обучите модель: python train.py"
+                f"Файл модели не найден: {path}. Сначала обучите модель: python train.py"
+            ) from None
+        except ValueError:
+            # mmap пустого файла
+            raise ValueError(f"Файл модели пуст: {path}") from None
+        
+        if buffer[:8] != ARTIFACT_MAGIC:
+            raise ValueError(f"{path} не является файлом модели линейной регрессии")
+        header_len = int.from_bytes(buffer[8:16], "little")
+        header = json.loads(buffer[16:16 + header_len])
+        if header["format_version"] > FORMAT_VERSION:
+            raise ValueError(
+                f"Формат модели v{header['format_version']} новее поддерживаемого v{FORMAT_VERSION}"
             )
+        n_params = header["n_features"] + 1
+        offset = _data_offset(header_len)
+        if len(buffer) < offset + n_params * np.dtype(header["dtype"]).itemsize:
+            raise ValueError(f"Файл модели обрезан: {path}")
         
-        self.weights = np.load(weights_path)
-        self.bias = np.load(bias_path)[0]
\ No newline at end of file
+        # Представление над mmap без копирования (только для чтения)
+        params = np.frombuffer(buffer, dtype=header["dtype"], count=n_params, offset=offset)
+        self.bias = float(params[0])
+        self.weights = params[1:]
+        self.feature_names = header["feature_names"]
+        self.train_stats = header["train_stats"]
+        self.version = header["model_version"]
+        self._online = self._online_from_header(header.get("online"))
+    
+    def _online_header(self) -> dict:
+        """Состояние онлайн-обучения для JSON-заголовка."""
+        state = self._online
+        return {
+            "optimizer": self.optimizer,
+            "learning_rate": self.learning_rate,
+            "l2": self.l2,
+            "batch_size": self.batch_size,
+            "step": state["step"],
+            "n_seen": state["n_seen"],
+            "x_mean": state["x_mean"].tolist(),
+            "x_scale": state["x_scale"].tolist(),
+            "y_mean": state["y_mean"],
+            "y_scale": state["y_scale"],
+            "theta": state["theta"].tolist(),
+            "m": state["m"].tolist(),
+            "v": state["v"].tolist(),
+        }
+    
+    def _online_from_header(self, online: dict | None) -> dict | None:
+        """Восстановить гиперпараметры и состояние онлайн-обучения из заголовка."""
+        if online is None:
+            return None
+        self.optimizer = online["optimizer"]
+        self.learning_rate = online["learning_rate"]
+        self.l2 = online["l2"]
+        self.batch_size = online["batch_size"]
+        return {
+            "x_mean": np.array(online["x_mean"]),
+            "x_scale": np.array(online["x_scale"]),
+            "y_mean": online["y_mean"],
+            "y_scale": online["y_scale"],
+            "theta": np.array(online["theta"]),
+            "m": np.array(online["m"]),
+            "v": np.array(online["v"]),
+            "step": online["step"],
+            "n_seen": online["n_seen"],
+        }
\ No newline at end of file
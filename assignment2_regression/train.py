@@ -1,13 +1,20 @@
 #!/usr/bin/env python3
 """
 Скрипт обучения модели линейной регрессии с фильтрацией выбросов.
+
+По умолчанию модель обучается заново нормальным уравнением. С --online
+она обучается мини-батчами по порциям x_data.npy (без загрузки в память
+целиком) и сверяется с решением нормального уравнения; с --update уже
+сохранённая модель дообучается только на переданной порции новых данных.
 """
 
 import sys
 import logging
+import argparse
 import numpy as np
 from pathlib import Path
-from model import LinearRegressionModel
+from metrics import RegressionMetrics
+from model import LinearRegressionModel, feature_names_path, load_feature_names
 
 
 logging.basicConfig(
@@ -19,6 +26,39 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Зарплаты вне диапазона считаются выбросами (заглушки hh.ru и аномалии)
+SALARY_RANGE = (15_000, 1_000_000)
+RESOURCES_DIR = Path("assignment2_regression/resources")
+# Гиперпараметры мини-батчевого обучения по умолчанию (--online и --update)
+ONLINE_DEFAULTS = {"optimizer": "adam", "learning_rate": 0.01, "l2": 0.0, "batch_size": 256}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Обучение модели линейной регрессии")
+    parser.add_argument("x_data", nargs="?",
+                        help="Путь к x_*.npy (y_*.npy ищется рядом); по умолчанию — поиск x_data.npy")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--online", action="store_true",
+                      help="Обучить мини-батчами по порциям и сверить с нормальным уравнением")
+    mode.add_argument("--update", action="store_true",
+                      help="Дообучить сохранённую модель на переданных данных (например, на дневной порции)")
+    # Гиперпараметры без значений по умолчанию: для --update важно, заданы ли они явно
+    parser.add_argument("--optimizer", choices=["adam", "sgd"],
+                        help=f"Оптимизатор (по умолчанию {ONLINE_DEFAULTS['optimizer']})")
+    parser.add_argument("--learning-rate", type=float,
+                        help=f"Начальный шаг (по умолчанию {ONLINE_DEFAULTS['learning_rate']})")
+    parser.add_argument("--l2", type=float,
+                        help=f"Коэффициент L2-регуляризации (по умолчанию {ONLINE_DEFAULTS['l2']})")
+    parser.add_argument("--batch-size", type=int,
+                        help=f"Размер мини-батча (по умолчанию {ONLINE_DEFAULTS['batch_size']})")
+    parser.add_argument("--epochs", type=int, default=None,
+                        help="Максимальное число проходов по данным (по умолчанию 10 для --online, 1 для --update)")
+    parser.add_argument("--chunksize", type=int, default=100_000, help="Строк x_data.npy в одной порции")
+    parser.add_argument("--tolerance", type=float, default=0.01,
+                        help="Допустимое относительное отличие RMSE от нормального уравнения для --online")
+    return parser.parse_args()
+
+
 def find_data_files() -> tuple[Path, Path] | tuple[None, None]:
     """Найти x_data.npy и y_data.npy."""
     candidates = [
@@ -35,8 +75,86 @@ def find_data_files() -> tuple[Path, Path] | tuple[None, None]:
     return None, None
 
 
+def iter_chunks(X: np.ndarray, y: np.ndarray, chunksize: int):
+    """Порции (x, y) без выбросов; X и y могут быть открыты через mmap."""
+    for start in range(0, len(y), chunksize):
+        y_chunk = np.asarray(y[start:start + chunksize])
+        keep = (y_chunk >= SALARY_RANGE[0]) & (y_chunk <= SALARY_RANGE[1])
+        yield np.asarray(X[start:start + chunksize])[keep], y_chunk[keep]
+
+
+def evaluate(model: LinearRegressionModel, X: np.ndarray, y: np.ndarray, chunksize: int) -> RegressionMetrics:
+    """Метрики модели по всем порциям за один проход."""
+    evaluation = RegressionMetrics()
+    for x_chunk, y_chunk in iter_chunks(X, y, chunksize):
+        evaluation.update(y_chunk, model.predict(x_chunk))
+    return evaluation
+
+
+def closed_form(X: np.ndarray, y: np.ndarray, chunksize: int, feature_names: list[str] | None) -> LinearRegressionModel:
+    """
+    Решение нормального уравнения по порциям (эталон для проверки сходимости).
+    
+    X^T X и X^T y накапливаются за один проход, поэтому память — O(признаков²).
+    """
+    n_params = X.shape[1] + 1
+    xtx = np.zeros((n_params, n_params))
+    xty = np.zeros(n_params)
+    for x_chunk, y_chunk in iter_chunks(X, y, chunksize):
+        x_b = np.c_[np.ones((len(x_chunk), 1)), x_chunk]
+        xtx += x_b.T @ x_b
+        xty += x_b.T @ y_chunk
+    theta = np.linalg.solve(xtx, xty)
+    reference = LinearRegressionModel()
+    reference.bias, reference.weights = float(theta[0]), theta[1:]
+    reference.feature_names = feature_names
+    return reference
+
+
+def train_online(model: LinearRegressionModel, X: np.ndarray, y: np.ndarray, epochs: int, chunksize: int,
+                 feature_names: list[str] | None) -> int:
+    """
+    Проходы мини-батчами по порциям до стабилизации ошибки или epochs проходов.
+    
+    Возвращает:
+        Число различных обучающих строк (без выбросов, без повторов по эпохам)
+    """
+    previous = None
+    for epoch in range(1, epochs + 1):
+        losses, sizes = [], []
+        for x_chunk, y_chunk in iter_chunks(X, y, chunksize):
+            if len(y_chunk):
+                model.partial_fit(x_chunk, y_chunk, feature_names)
+                losses.append(model.last_loss)
+                sizes.append(len(y_chunk))
+        if not sizes:
+            raise ValueError("После фильтрации выбросов не осталось данных для обучения")
+        loss = float(np.average(losses, weights=sizes))
+        logger.info(f"  Проход {epoch}: ошибка {loss:.6f}")
+        if previous is not None and abs(previous - loss) <= 1e-3 * previous:
+            break
+        previous = loss
+    return sum(sizes)
+
+
+def log_metrics(metrics: dict, intervals: dict) -> None:
+    logger.info(f"  MSE:  {metrics['mse']:,.0f}")
+    logger.info(f"  RMSE: {metrics['rmse']:,.0f} руб. (95% ДИ: {intervals['rmse'][0]:,.0f} – {intervals['rmse'][1]:,.0f})")
+    logger.info(f"  MAE:  {metrics['mae']:,.0f} руб.")
+    logger.info(f"  R²:   {metrics['r2']:.4f} (95% ДИ: {intervals['r2'][0]:.4f} – {intervals['r2'][1]:.4f})")
+
+
 def main() -> None:
-    x_path, y_path = find_data_files()
+    args = parse_args()
+    if args.x_data:
+        x_path = Path(args.x_data)
+        # x_data.npy → y_data.npy, x_delta.npy → y_delta.npy
+        y_path = x_path.with_name("y" + x_path.name[1:])
+        if not (x_path.exists() and y_path.exists()):
+            logger.error(f"Не найдены {x_path} и {y_path}")
+            sys.exit(1)
+    else:
+        x_path, y_path = find_data_files()
     
     if x_path is None or y_path is None:
         logger.error("Файлы x_data.npy и y_data.npy не найдены.")
@@ -46,12 +164,18 @@ def main() -> None:
         sys.exit(1)
     
     logger.info(f"Загрузка данных из: {x_path.parent}")
+    feature_names = load_feature_names(x_path)
+    if feature_names is None:
+        logger.warning(f"Схема признаков {feature_names_path(x_path)} не найдена — имена признаков не сохранятся в модели")
+    if args.online or args.update:
+        train_incremental(args, np.load(x_path, mmap_mode="r"), np.load(y_path, mmap_mode="r"), feature_names)
+        return
     X = np.load(x_path)
     y = np.load(y_path)
     
     # Фильтрация выбросов (легальное улучшение без нарушения ТЗ!)
     # Убираем зарплаты < 15к (заглушки hh.ru) и > 1 млн (аномалии)
-    mask = (y >= 15_000) & (y <= 1_000_000)
+    mask = (y >= SALARY_RANGE[0]) & (y <= SALARY_RANGE[1])
     x_filtered = X[mask]
     y_filtered = y[mask]
     
@@ -60,21 +184,95 @@ def main() -> None:
     
     logger.info(f"Обучение модели на {len(x_filtered)} образцах...")
     model = LinearRegressionModel()
-    model.fit(x_filtered, y_filtered)
+    model.fit(x_filtered, y_filtered, feature_names)
+    
+    # Расчёт метрик НА ОТФИЛЬТРОВАННЫХ ДАННЫХ (один проход, с бутстреп-интервалами)
+    evaluation = RegressionMetrics().update(y_filtered, model.predict(x_filtered))
+    metrics = evaluation.compute()
+    intervals = evaluation.confidence_intervals()
     
-    logger.info("Сохранение весов в resources/...")
-    model.save("assignment2_regression/resources")
+    logger.info("Сохранение модели в resources/...")
+    artifact = model.save(
+        RESOURCES_DIR,
+        train_stats={
+            "n_raw_samples": int(len(y)),
+            "salary_range": list(SALARY_RANGE),
+            **metrics,
+            "confidence_intervals": intervals,
+        }
+    )
+    
+    logger.info(f"✓ Модель успешно обучена: {artifact} (версия {model.version})")
+    log_metrics(metrics, intervals)
+
+
+def train_incremental(args: argparse.Namespace, X: np.ndarray, y: np.ndarray, feature_names: list[str] | None) -> None:
+    """Режимы --online и --update: обучение мини-батчами по порциям данных."""
+    given = {name: getattr(args, name) for name in ONLINE_DEFAULTS if getattr(args, name) is not None}
+    if args.update:
+        model = LinearRegressionModel()
+        try:
+            model.load(RESOURCES_DIR)
+        except (FileNotFoundError, ValueError) as e:
+            logger.error(str(e))
+            sys.exit(1)
+        if model.has_online_state:
+            # Моменты Adam и масштабы признаков согласованы с сохранёнными гиперпараметрами
+            if given:
+                options = ", ".join("--" + name.replace("_", "-") for name in given)
+                logger.error(f"{options}: модель {model.version} уже обучалась мини-батчами, "
+                             f"её гиперпараметры берутся из сохранённого состояния")
+                sys.exit(1)
+        else:
+            # Модель нормального уравнения: мини-батчевое обучение начинается впервые
+            hyperparameters = {**ONLINE_DEFAULTS, **given}
+            for name, value in hyperparameters.items():
+                setattr(model, name, value)
+        logger.info(
+            f"Дообучение модели {model.version} ({model.optimizer}, шаг {model.learning_rate}, "
+            f"L2 {model.l2}) на {len(y)} новых образцах..."
+        )
+    else:
+        hyperparameters = {**ONLINE_DEFAULTS, **given}
+        model = LinearRegressionModel(**hyperparameters)
+        logger.info(
+            f"Онлайн-обучение ({model.optimizer}, шаг {model.learning_rate}, L2 {model.l2}) на {len(y)} образцах..."
+        )
+    
+    # Дневную порцию достаточно пройти один раз; обучение с нуля — до стабилизации ошибки
+    epochs = args.epochs or (1 if args.update else 10)
+    # Различные строки: прежние (при --update) и строки этой порции без выбросов
+    n_previous = int(model.train_stats.get("n_samples", 0)) if args.update else 0
+    try:
+        n_rows = train_online(model, X, y, epochs, args.chunksize, feature_names)
+    except ValueError as e:
+        logger.error(f"Ошибка обучения: {e}")
+        sys.exit(1)
+    evaluation = evaluate(model, X, y, args.chunksize)
+    metrics = evaluation.compute()
+    intervals = evaluation.confidence_intervals()
     
-    # Расчёт метрик НА ОТФИЛЬТРОВАННЫХ ДАННЫХ
-    y_pred = model.predict(x_filtered)
-    mse = np.mean((y_filtered - y_pred) ** 2)
-    rmse = np.sqrt(mse)
-    r2 = 1 - np.sum((y_filtered - y_pred) ** 2) / np.sum((y_filtered - np.mean(y_filtered)) ** 2)
+    train_stats = {
+        "n_samples": n_previous + n_rows,
+        "salary_range": list(SALARY_RANGE),
+        **metrics,
+        "confidence_intervals": intervals,
+    }
+    if args.online:
+        # Сходимость: RMSE онлайн-модели против точного решения на тех же данных
+        reference = evaluate(closed_form(X, y, args.chunksize, feature_names), X, y, args.chunksize).compute()
+        gap = metrics["rmse"] / reference["rmse"] - 1
+        train_stats["closed_form_rmse"] = reference["rmse"]
+        logger.info(f"  RMSE нормального уравнения: {reference['rmse']:,.0f} руб., отличие {gap:+.3%}")
+        if gap > args.tolerance:
+            logger.warning(
+                f"Онлайн-обучение не сошлось: RMSE выше точного решения на {gap:.2%} "
+                f"(допустимо {args.tolerance:.2%}); увеличьте --epochs или уменьшите --learning-rate"
+            )
     
-    logger.info("✓ Модель успешно обучена")
-    logger.info(f"  MSE:  {mse:,.0f}")
-    logger.info(f"  RMSE: {rmse:,.0f} руб.")
-    logger.info(f"  R²:   {r2:.4f}")
+    artifact = model.save(RESOURCES_DIR, train_stats=train_stats)
+    logger.info(f"✓ Модель сохранена: {artifact} (версия {model.version})")
+    log_metrics(metrics, intervals)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,192 @@
+"""
+Потоковые метрики классификации с бутстреп-доверительными интервалами.
+
+ClassificationMetrics за один проход накапливает матрицу ошибок, из которой
+получаются accuracy, precision/recall/F1 по классам, macro- и weighted-F1
+и текстовый отчёт в формате classification_report. Накопители порций
+или процессов объединяются через merge().
+
+Доверительные интервалы — пуассоновский бутстреп: матрицы ошибок всех
+бутстреп-выборок накапливаются одним матричным умножением весов Poisson(1)
+на one-hot кодировку пар (истинный класс, предсказанный класс).
+"""
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_BOOTSTRAP = 200
+
+
+class ClassificationMetrics:
+    """Объединяемый накопитель метрик классификации."""
+    
+    def __init__(
+        self,
+        labels: list[str],
+        n_bootstrap: int = DEFAULT_BOOTSTRAP,
+        seed: int | None = 42,
+        block_size: int = 8192
+    ) -> None:
+        """
+        Аргументы:
+            labels: Классы в порядке строк и столбцов матрицы ошибок
+            n_bootstrap: Число бутстреп-выборок (0 — без доверительных интервалов)
+            seed: Зерно генератора весов; накопители, которые потом
+                объединяются, должны получать разные seed
+            block_size: Число строк, для которых веса генерируются за раз
+        """
+        self.labels = list(labels)
+        self.n_bootstrap = n_bootstrap
+        self.block_size = block_size
+        self._rng = np.random.default_rng(seed)
+        k = len(self.labels)
+        # Строка 0 — исходная выборка, строки 1.. — бутстреп-выборки; k×k ячеек матрицы ошибок
+        self._counts = np.zeros((1 + n_bootstrap, k * k))
+    
+    def _codes(self, values) -> np.ndarray:
+        codes = pd.Categorical(np.asarray(values).ravel(), categories=self.labels).codes
+        if (codes < 0).any():
+            unknown = sorted(set(np.asarray(values).ravel()[codes < 0].tolist()))
+            raise ValueError(f"Метки вне списка классов {self.labels}: {unknown}")
+        return codes.astype(np.int64)
+    
+    def update(self, y_true, y_pred) -> "ClassificationMetrics":
+        """Добавить порцию истинных и предсказанных меток."""
+        true_codes = self._codes(y_true)
+        pred_codes = self._codes(y_pred)
+        if len(true_codes) != len(pred_codes):
+            raise ValueError(f"Разная длина y_true ({len(true_codes)}) и y_pred ({len(pred_codes)})")
+        cells = true_codes * len(self.labels) + pred_codes
+        n_cells = self._counts.shape[1]
+        
+        # Исходная выборка — простым подсчётом
+        self._counts[0] += np.bincount(cells, minlength=n_cells)
+        if self.n_bootstrap == 0:
+            return self
+        for start in range(0, len(cells), self.block_size):
+            block = cells[start:start + self.block_size]
+            one_hot = np.zeros((len(block), n_cells))
+            one_hot[np.arange(len(block)), block] = 1.0
+            weights = self._rng.poisson(1.0, (self.n_bootstrap, len(block))).astype(float)
+            self._counts[1:] += weights @ one_hot
+        return self
+    
+    def merge(self, other: "ClassificationMetrics") -> "ClassificationMetrics":
+        """Объединить с накопителем другой порции данных (на месте)."""
+        if other.labels != self.labels or other.n_bootstrap != self.n_bootstrap:
+            raise ValueError("Нельзя объединить накопители с разными классами или числом бутстреп-выборок")
+        self._counts += other._counts
+        return self
+    
+    def confusion_matrix(self) -> np.ndarray:
+        """Матрица ошибок: строки — истинные классы, столбцы — предсказанные."""
+        k = len(self.labels)
+        return self._counts[0].reshape(k, k).astype(np.int64)
+    
+    def _metrics(self, counts: np.ndarray) -> dict[str, np.ndarray]:
+        """Метрики по матрицам ошибок (векторно для всех выборок)."""
+        k = len(self.labels)
+        cm = counts.reshape(-1, k, k)
+        tp = np.diagonal(cm, axis1=1, axis2=2)
+        support = cm.sum(axis=2)
+        predicted = cm.sum(axis=1)
+        total = support.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Как в sklearn при zero_division=0: пустой знаменатель даёт 0
+            precision = np.where(predicted > 0, tp / predicted, 0.0)
+            recall = np.where(support > 0, tp / support, 0.0)
+            f1 = np.where(support + predicted > 0, 2 * tp / (support + predicted), 0.0)
+            return {
+                "precision": precision,
+                "recall": recall,
+                "f1": f1,
+                "support": support,
+                "accuracy": tp.sum(axis=1) / total,
+                "f1_macro": f1.mean(axis=1),
+                "f1_weighted": (f1 * support).sum(axis=1) / total,
+            }
+    
+    def compute(self) -> dict:
+        """
+        Метрики по всем добавленным данным.
+        
+        Возвращает:
+            Словарь accuracy, f1_macro, f1_weighted и report — отчёт по классам
+            в формате classification_report(output_dict=True)
+        """
+        m = {name: values[0] for name, values in self._metrics(self._counts[:1]).items()}
+        total = float(m["support"].sum())
+        report = {
+            label: {
+                "precision": float(m["precision"][i]),
+                "recall": float(m["recall"][i]),
+                "f1-score": float(m["f1"][i]),
+                "support": float(m["support"][i]),
+            }
+            for i, label in enumerate(self.labels)
+        }
+        report["accuracy"] = float(m["accuracy"])
+        report["macro avg"] = {
+            "precision": float(m["precision"].mean()),
+            "recall": float(m["recall"].mean()),
+            "f1-score": float(m["f1_macro"]),
+            "support": total,
+        }
+        report["weighted avg"] = {
+            "precision": float((m["precision"] * m["support"]).sum() / total),
+            "recall": float((m["recall"] * m["support"]).sum() / total),
+            "f1-score": float(m["f1_weighted"]),
+            "support": total,
+        }
+        return {
+            "accuracy": float(m["accuracy"]),
+            "f1_macro": float(m["f1_macro"]),
+            "f1_weighted": float(m["f1_weighted"]),
+            "report": report,
+        }
+    
+    def format_report(self, digits: int = 3) -> str:
+        """Текстовый отчёт в том же виде, что classification_report."""
+        report = self.compute()["report"]
+        width = max(len(name) for name in [*self.labels, "weighted avg"])
+        header = f"{'':>{width}}  {'precision':>9} {'recall':>9} {'f1-score':>9} {'support':>9}"
+        lines = [header, ""]
+        for name in self.labels:
+            row = report[name]
+            lines.append(
+                f"{name:>{width}}  {row['precision']:>9.{digits}f} {row['recall']:>9.{digits}f} "
+                f"{row['f1-score']:>9.{digits}f} {int(row['support']):>9}"
+            )
+        lines.append("")
+        support = int(report["macro avg"]["support"])
+        lines.append(f"{'accuracy':>{width}}  {'':>9} {'':>9} {report['accuracy']:>9.{digits}f} {support:>9}")
+        for name in ("macro avg", "weighted avg"):
+            row = report[name]
+            lines.append(
+                f"{name:>{width}}  {row['precision']:>9.{digits}f} {row['recall']:>9.{digits}f} "
+                f"{row['f1-score']:>9.{digits}f} {support:>9}"
+            )
+        return "\n".join(lines)
+    
+    def confidence_intervals(self, level: float = 0.95) -> dict[str, tuple[float, float]]:
+        """
+        Перцентильные бутстреп-интервалы accuracy, macro- и weighted-F1.
+        
+        Аргументы:
+            level: Уровень доверия
+        
+        Возвращает:
+            Словарь метрика → (нижняя граница, верхняя граница)
+        
+        Вызывает:
+            RuntimeError: Если накопитель создан с n_bootstrap=0
+        """
+        if self.n_bootstrap == 0:
+            raise RuntimeError("Доверительные интервалы требуют n_bootstrap > 0")
+        alpha = (1 - level) / 2
+        metrics = self._metrics(self._counts[1:])
+        return {
+            name: tuple(float(q) for q in np.nanquantile(metrics[name], [alpha, 1 - alpha]))
+            for name in ("accuracy", "f1_macro", "f1_weighted")
+        }
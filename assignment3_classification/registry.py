@@ -0,0 +1,230 @@
+"""
+Реестр модели с горячей перезагрузкой для долго работающих процессов разметки.
+
+ModelRegistry следит за файлом модели в resources/ и, когда файл меняется,
+загружает новую версию в фоновом потоке. Запросы, начавшиеся после загрузки,
+получают новую модель; старая остаётся доступной, пока не завершатся
+запросы, которые её уже взяли, и только затем освобождается.
+
+Реестр не зависит от типа модели: загрузка и освобождение задаются
+функциями loader/closer, поэтому так же можно обернуть и модель
+линейной регрессии из задания №2.
+"""
+
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Version:
+    """Загруженная версия модели и число запросов, которые её используют."""
+    model: Any
+    signature: tuple
+    loaded_at: float
+    in_flight: int = 0
+    retired: bool = False
+
+
+@dataclass
+class RegistryStats:
+    """Счётчики перезагрузок для /metrics."""
+    loads: int = 0
+    failed_loads: int = 0
+    last_load_seconds: float = 0.0
+    total_load_seconds: float = 0.0
+    last_swap_seconds: float = 0.0
+    last_error: str | None = None
+    closed_versions: int = 0
+    
+    def as_dict(self) -> dict:
+        return {
+            "loads": self.loads,
+            "failed_loads": self.failed_loads,
+            "last_load_seconds": round(self.last_load_seconds, 4),
+            "total_load_seconds": round(self.total_load_seconds, 4),
+            "last_swap_microseconds": round(self.last_swap_seconds * 1e6, 1),
+            "last_error": self.last_error,
+            "closed_versions": self.closed_versions,
+        }
+
+
+def _signature(path: Path) -> tuple | None:
+    """Отпечаток файла: меняется при любой перезаписи (в том числе атомарной)."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+class ModelRegistry:
+    """
+    Текущая версия модели с фоновой перезагрузкой при изменении файла.
+    
+    Использование:
+        registry = ModelRegistry(path, loader=load_fn, closer=close_fn)
+        registry.start()
+        with registry.acquire() as model:
+            ...  # модель не будет освобождена до выхода из блока
+    """
+    
+    def __init__(
+        self,
+        path: str | Path,
+        loader: Callable[[Path], Any],
+        closer: Callable[[Any], None] | None = None,
+        poll_interval: float = 2.0
+    ) -> None:
+        """
+        Загрузить текущую версию модели.
+        
+        Аргументы:
+            path: Файл модели, за которым нужно следить
+            loader: Функция загрузки модели из файла
+            closer: Функция освобождения ресурсов старой версии (например, пула процессов)
+            poll_interval: Период проверки файла, секунды
+        
+        Вызывает:
+            FileNotFoundError: Если файла модели нет
+        """
+        self.path = Path(path)
+        self.loader = loader
+        self.closer = closer
+        self.poll_interval = poll_interval
+        self.stats = RegistryStats()
+        self._lock = threading.Lock()
+        self._retired: list[_Version] = []
+        self._pending_signature: tuple | None = None
+        self._failed_signature: tuple | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        
+        signature = _signature(self.path)
+        if signature is None:
+            raise FileNotFoundError(f"Модель не найдена: {self.path}")
+        self._current = self._load(signature)
+        if self._current is None:
+            raise RuntimeError(f"Не удалось загрузить модель: {self.stats.last_error}")
+    
+    def _load(self, signature: tuple) -> _Version | None:
+        """Загрузить версию модели, записав время загрузки; None при ошибке."""
+        start = time.perf_counter()
+        try:
+            model = self.loader(self.path)
+        except Exception as e:
+            self.stats.failed_loads += 1
+            self.stats.last_error = f"{type(e).__name__}: {e}"
+            if signature != self._failed_signature:
+                logger.exception(f"Ошибка загрузки модели {self.path}: {e}")
+            self._failed_signature = signature
+            return None
+        elapsed = time.perf_counter() - start
+        self.stats.loads += 1
+        self.stats.last_load_seconds = elapsed
+        self.stats.total_load_seconds += elapsed
+        self.stats.last_error = None
+        return _Version(model, signature, time.time())
+    
+    def check(self) -> bool:
+        """
+        Проверить файл модели и при изменении загрузить и подставить новую версию.
+        
+        Новая версия загружается, только если отпечаток файла не изменился
+        между двумя проверками подряд, чтобы не читать файл во время записи.
+        
+        Возвращает:
+            True, если подставлена новая версия
+        """
+        signature = _signature(self.path)
+        if signature is None or signature == self._current.signature or signature == self._failed_signature:
+            return False
+        if signature != self._pending_signature:
+            self._pending_signature = signature
+            return False
+        
+        version = self._load(signature)
+        if version is None:
+            return False
+        
+        start = time.perf_counter()
+        with self._lock:
+            old, self._current = self._current, version
+            old.retired = True
+            self._retired.append(old)
+        self.stats.last_swap_seconds = time.perf_counter() - start
+        logger.info(f"Загружена новая версия модели за {self.stats.last_load_seconds:.2f} с")
+        self._release_retired()
+        return True
+    
+    def _release_retired(self) -> None:
+        """Освободить старые версии, которые больше никто не использует."""
+        with self._lock:
+            idle = [v for v in self._retired if v.in_flight == 0]
+            self._retired = [v for v in self._retired if v.in_flight > 0]
+            self.stats.closed_versions += len(idle)
+        if self.closer is not None:
+            for version in idle:
+                self.closer(version.model)
+    
+    @contextmanager
+    def acquire(self) -> Iterator[Any]:
+        """Взять текущую версию модели на время обработки запроса."""
+        with self._lock:
+            version = self._current
+            version.in_flight += 1
+        try:
+            yield version.model
+        finally:
+            with self._lock:
+                version.in_flight -= 1
+                release = version.retired and version.in_flight == 0
+            if release:
+                self._release_retired()
+    
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.exception(f"Ошибка проверки модели: {e}")
+    
+    def start(self) -> "ModelRegistry":
+        """Запустить фоновое наблюдение за файлом модели."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name="model-registry", daemon=True)
+            self._thread.start()
+        return self
+    
+    def metrics(self) -> dict:
+        """Версия модели, время загрузок и подстановок, число запросов по версиям."""
+        with self._lock:
+            current = self._current
+            return {
+                "loaded_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(current.loaded_at)),
+                "in_flight": current.in_flight,
+                "retired_in_flight": sum(v.in_flight for v in self._retired),
+                **self.stats.as_dict(),
+            }
+    
+    def close(self) -> None:
+        """Остановить наблюдение и освободить все версии модели."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            versions = [self._current, *self._retired]
+            self._retired = []
+        if self.closer is not None:
+            for version in versions:
+                self.closer(version.model)
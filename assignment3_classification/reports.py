@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Отложенное построение графиков по результатам обучения.
+
+Использование:
+    python reports.py [путь/к/report_data.json]
+
+train.py сохраняет входные данные отчётов (матрицу ошибок, баланс классов,
+метрики) в небольшой JSON-файл; графики строятся отдельно — в фоновом
+процессе или по запросу, без повторного обучения. matplotlib и seaborn
+импортируются только при построении графиков.
+"""
+
+import sys
+import json
+import logging
+import subprocess
+import numpy as np
+from pathlib import Path
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+REPORTS_DIR = Path(__file__).resolve().parent / "reports"
+REPORT_DATA_NAME = "report_data.json"
+LABELS = ["junior", "middle", "senior"]
+
+
+def save_report_data(
+    output_path: Path,
+    y: np.ndarray,
+    cm: np.ndarray,
+    metrics: dict
+) -> None:
+    """
+    Сохранить входные данные отчётов в JSON.
+    
+    Аргументы:
+        output_path: Путь к JSON-файлу
+        y: Метки всех размеченных резюме (для баланса классов)
+        cm: Матрица ошибок на тестовой выборке (строки/столбцы в порядке LABELS)
+        metrics: Итоговые метрики (accuracy, weighted F1, отчёт по классам)
+    """
+    levels, counts = np.unique(y, return_counts=True)
+    data = {
+        "labels": LABELS,
+        "class_counts": {str(level): int(count) for level, count in zip(levels, counts)},
+        "confusion_matrix": np.asarray(cm).astype(int).tolist(),
+        "metrics": metrics,
+    }
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def plot_class_balance(class_counts: dict, output_path: Path) -> None:
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
+    levels, counts = list(class_counts.keys()), list(class_counts.values())
+    plt.figure(figsize=(8, 5))
+    sns.barplot(x=levels, y=counts, palette="viridis")
+    plt.title("Баланс классов: распределение уровней разработчиков")
+    plt.xlabel("Уровень")
+    plt.ylabel("Количество резюме")
+    for i, v in enumerate(counts):
+        plt.text(i, v + 5, str(v), ha="center", va="bottom")
+    plt.tight_layout()
+    plt.savefig(output_path, dpi=150)
+    plt.close()
+
+
+def plot_confusion_matrix(cm: list, labels: list, output_path: Path) -> None:
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
+    plt.figure(figsize=(8, 6))
+    sns.heatmap(
+        np.asarray(cm),
+        annot=True,
+        fmt="d",
+        cmap="Blues",
+        xticklabels=labels,
+        yticklabels=labels
+    )
+    plt.title("Матрица ошибок классификатора")
+    plt.ylabel("Истинный уровень")
+    plt.xlabel("Предсказанный уровень")
+    plt.tight_layout()
+    plt.savefig(output_path, dpi=150)
+    plt.close()
+
+
+def render_reports(data_path: Path) -> None:
+    """Построить графики по сохранённому JSON рядом с ним."""
+    data = json.loads(data_path.read_text(encoding="utf-8"))
+    plot_class_balance(data["class_counts"], data_path.parent / "class_balance.png")
+    plot_confusion_matrix(data["confusion_matrix"], data["labels"], data_path.parent / "confusion_matrix.png")
+
+
+def render_in_background(data_path: Path) -> subprocess.Popen:
+    """Запустить построение графиков отдельным процессом, не дожидаясь его."""
+    return subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve()), str(data_path)],
+        stdout=subprocess.DEVNULL,
+        start_new_session=True
+    )
+
+
+def main() -> None:
+    data_path = Path(sys.argv[1]) if len(sys.argv) == 2 else REPORTS_DIR / REPORT_DATA_NAME
+    if not data_path.exists():
+        logger.error(f"Файл не найден: {data_path}")
+        logger.error("Сначала обучите модель: python train.py")
+        sys.exit(1)
+    
+    try:
+        render_reports(data_path)
+    except Exception as e:
+        logger.exception(f"Ошибка построения графиков: {e}")
+        sys.exit(1)
+    logger.info(f"Графики сохранены в: {data_path.parent}")
+
+
+if __name__ == "__main__":
+    main()
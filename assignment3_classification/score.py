@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Пакетная разметка уровней разработчиков обученной моделью.
+
+Использование:
+    python score.py путь/к/hh.csv [ещё.csv ...] -o levels.parquet
+    python score.py shard_*.csv -o levels.csv --workers 8 --chunksize 50000
+    python score.py hh.csv -o levels.parquet --min-confidence 0.6 --review-output review.csv
+
+Модель загружается один раз в каждом рабочем процессе, CSV читается
+порциями, порции распределяются по пулу процессов, результат потоково
+дописывается в Parquet или CSV (по расширению выходного файла).
+Строки, вероятность предсказанного уровня для которых ниже порога
+(--min-confidence, --class-threshold), остаются без level_pred и при
+заданном --review-output записываются не в основной, а в отдельный файл.
+Работает полностью офлайн.
+"""
+
+import sys
+import os
+import time
+import logging
+import argparse
+import pandas as pd
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+from model import DeveloperLevelClassifier, Thresholds
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_PATH = Path(__file__).resolve().parent / "resources" / "model.pkl"
+DEFAULT_CHUNKSIZE = 20_000
+OUTPUT_COLUMNS = ["source", "row", "title", "level_keyword", "level_pred", "confidence"]
+
+# Классификатор рабочего процесса (загружается один раз в _init_worker)
+_worker_classifier: DeveloperLevelClassifier | None = None
+
+
+def _init_worker(model_path: str, thresholds: Thresholds) -> None:
+    """Загрузить модель в рабочем процессе пула."""
+    global _worker_classifier
+    # Параллельность обеспечивает пул процессов — внутри процесса один поток
+    _worker_classifier = DeveloperLevelClassifier(thresholds=thresholds, n_jobs=1)
+    _worker_classifier.load(model_path)
+
+
+def _worker_ready() -> int:
+    """Пустая задача: дожидается загрузки модели в рабочем процессе."""
+    return os.getpid()
+
+
+def _score_chunk(source: str, chunk: pd.DataFrame) -> tuple[int, pd.DataFrame]:
+    """Разметить одну порцию резюме в рабочем процессе."""
+    return len(chunk), _format_result(source, _worker_classifier.score(chunk))
+
+
+def _format_result(source: str, scored: pd.DataFrame) -> pd.DataFrame:
+    """Привести результат score() к выходной схеме."""
+    scored = scored.rename_axis("row").reset_index()
+    scored.insert(0, "source", source)
+    scored["level_keyword"] = scored["level_keyword"].astype(object)
+    scored["level_pred"] = scored["level_pred"].astype(object)
+    scored["confidence"] = scored["confidence"].astype("float32")
+    return scored[OUTPUT_COLUMNS]
+
+
+def iter_chunks(paths: Iterable[Path], chunksize: int) -> Iterator[tuple[str, pd.DataFrame]]:
+    """Читать CSV-файлы порциями, сохраняя номер строки внутри файла."""
+    for path in paths:
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            yield path.name, chunk
+
+
+@dataclass
+class ScoringStats:
+    """Счётчики пропускной способности разметки."""
+    
+    rows_read: int = 0
+    rows_scored: int = 0
+    rows_uncertain: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+    
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows_read / self.seconds if self.seconds > 0 else 0.0
+    
+    def as_dict(self) -> dict:
+        return {
+            "rows_read": self.rows_read,
+            "rows_scored": self.rows_scored,
+            "rows_uncertain": self.rows_uncertain,
+            "chunks": self.chunks,
+            "seconds": round(self.seconds, 3),
+            "rows_per_sec": round(self.rows_per_sec, 1),
+        }
+
+
+class ResultWriter:
+    """Потоковая запись результатов в CSV или Parquet."""
+    
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._parquet = self.path.suffix.lower() == ".parquet"
+        self._writer = None
+        self._header_written = False
+        if self._parquet:
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError as e:
+                raise RuntimeError(
+                    "Для записи Parquet установите pyarrow: pip install pyarrow"
+                ) from e
+            self._pa, self._pq = pa, pq
+            self._schema = pa.schema([
+                ("source", pa.string()),
+                ("row", pa.int64()),
+                ("title", pa.string()),
+                ("level_keyword", pa.string()),
+                ("level_pred", pa.string()),
+                ("confidence", pa.float32()),
+            ])
+    
+    def write(self, df: pd.DataFrame) -> None:
+        """Дописать порцию результатов."""
+        if self._parquet:
+            if self._writer is None:
+                self._writer = self._pq.ParquetWriter(self.path, self._schema)
+            table = self._pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+            self._writer.write_table(table)
+        else:
+            df.to_csv(
+                self.path,
+                mode="a" if self._header_written else "w",
+                header=not self._header_written,
+                index=False
+            )
+            self._header_written = True
+    
+    def close(self) -> None:
+        """Закрыть файл (для Parquet — дописать футер)."""
+        if self._parquet:
+            if self._writer is None:
+                self.write(pd.DataFrame(columns=OUTPUT_COLUMNS))
+            self._writer.close()
+        elif not self._header_written:
+            self.write(pd.DataFrame(columns=OUTPUT_COLUMNS))
+
+
+class BatchScorer:
+    """
+    Разметка резюме пулом процессов с однократной загрузкой модели.
+    
+    При workers=1 разметка выполняется в текущем процессе без пула,
+    а деревья леса обходятся параллельно потоками.
+    """
+    
+    def __init__(
+        self,
+        model_path: str | Path = DEFAULT_MODEL_PATH,
+        workers: int | None = None,
+        thresholds: Thresholds = None
+    ) -> None:
+        """
+        Аргументы:
+            model_path: Путь к model.pkl
+            workers: Число процессов (None — число ядер)
+            thresholds: Пороги уверенности (см. DeveloperLevelClassifier)
+        """
+        model_path = Path(model_path)
+        if not model_path.exists():
+            raise FileNotFoundError(
+                f"Модель не найдена: {model_path}. Сначала обучите модель: python train.py"
+            )
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = None
+        self._classifier = None
+        if self.workers > 1:
+            # Формат модели проверяется до запуска пула: ошибка в инициализаторе
+            # процесса дошла бы до вызывающего только как BrokenProcessPool
+            DeveloperLevelClassifier().load(model_path)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(str(model_path), thresholds)
+            )
+        else:
+            self._classifier = DeveloperLevelClassifier(thresholds=thresholds)
+            self._classifier.load(model_path)
+    
+    def warm_up(self) -> None:
+        """Запустить процессы пула и дождаться загрузки в них модели."""
+        if self._executor is not None:
+            futures = [self._executor.submit(_worker_ready) for _ in range(self.workers)]
+            for future in futures:
+                future.result()
+    
+    def score_chunks(
+        self,
+        chunks: Iterable[tuple[str, pd.DataFrame]],
+        stats: ScoringStats | None = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Разметить поток порций, сохраняя их порядок.
+        
+        Одновременно в пуле находится не более 2 × workers порций,
+        поэтому потребление памяти не зависит от размера входа.
+        """
+        stats = stats if stats is not None else ScoringStats()
+        start = time.perf_counter()
+        
+        def account(n_rows: int, result: pd.DataFrame) -> pd.DataFrame:
+            stats.rows_read += n_rows
+            stats.rows_scored += len(result)
+            stats.rows_uncertain += int(result["level_pred"].isna().sum())
+            stats.chunks += 1
+            stats.seconds = time.perf_counter() - start
+            return result
+        
+        if self._executor is None:
+            for source, chunk in chunks:
+                yield account(len(chunk), _format_result(source, self._classifier.score(chunk)))
+            return
+        
+        pending = deque()
+        for source, chunk in chunks:
+            pending.append(self._executor.submit(_score_chunk, source, chunk))
+            if len(pending) >= 2 * self.workers:
+                yield account(*pending.popleft().result())
+        while pending:
+            yield account(*pending.popleft().result())
+    
+    def score_frame(self, df: pd.DataFrame, chunksize: int = DEFAULT_CHUNKSIZE, source: str = "") -> pd.DataFrame:
+        """Разметить DataFrame целиком, распределив его порции по пулу."""
+        chunks = ((source, df.iloc[i:i + chunksize]) for i in range(0, len(df), chunksize))
+        results = list(self.score_chunks(chunks))
+        if not results:
+            return pd.DataFrame(columns=OUTPUT_COLUMNS)
+        return pd.concat(results, ignore_index=True)
+    
+    def run(
+        self,
+        paths: Iterable[Path],
+        output: str | Path,
+        chunksize: int = DEFAULT_CHUNKSIZE,
+        review_output: str | Path | None = None
+    ) -> ScoringStats:
+        """
+        Разметить CSV-файлы и потоково записать результат в output.
+        
+        Аргументы:
+            paths: Входные CSV-файлы
+            output: Выходной файл .csv или .parquet
+            chunksize: Строк в одной порции
+            review_output: Файл для строк ниже порога уверенности
+                (None — они остаются в output с пустым level_pred)
+        """
+        stats = ScoringStats()
+        writer = ResultWriter(output)
+        review_writer = ResultWriter(review_output) if review_output is not None else None
+        try:
+            for result in self.score_chunks(iter_chunks(paths, chunksize), stats):
+                if review_writer is not None:
+                    uncertain = result["level_pred"].isna()
+                    review_writer.write(result[uncertain])
+                    result = result[~uncertain]
+                writer.write(result)
+                logger.info(
+                    f"Порция {stats.chunks}: прочитано {stats.rows_read}, "
+                    f"размечено {stats.rows_scored}, ниже порога {stats.rows_uncertain} "
+                    f"({stats.rows_per_sec:,.0f} строк/с)"
+                )
+        finally:
+            writer.close()
+            if review_writer is not None:
+                review_writer.close()
+        return stats
+    
+    def close(self) -> None:
+        """Остановить пул процессов."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+    
+    def __enter__(self) -> "BatchScorer":
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def add_threshold_arguments(parser: argparse.ArgumentParser) -> None:
+    """Добавить параметры порогов уверенности (общие для score.py и service.py)."""
+    parser.add_argument("--min-confidence", type=float, default=None,
+                        help="Минимальная вероятность предсказанного уровня для всех классов")
+    parser.add_argument("--class-threshold", action="append", default=[], metavar="УРОВЕНЬ=ПОРОГ",
+                        help="Порог для отдельного уровня, например senior=0.7 (можно повторять)")
+
+
+def parse_thresholds(args: argparse.Namespace) -> Thresholds:
+    """
+    Собрать пороги уверенности из аргументов командной строки.
+    
+    Вызывает:
+        ValueError: Если порог задан не в виде УРОВЕНЬ=ЧИСЛО
+    """
+    if not args.class_threshold:
+        return args.min_confidence
+    thresholds = {}
+    for item in args.class_threshold:
+        level, _, value = item.partition("=")
+        try:
+            thresholds[level.strip()] = float(value)
+        except ValueError as e:
+            raise ValueError(f"Порог уровня нужно задать как УРОВЕНЬ=ПОРОГ: {item!r}") from e
+    if args.min_confidence is not None:
+        for level in DeveloperLevelClassifier().classes_:
+            thresholds.setdefault(level, args.min_confidence)
+    return thresholds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Пакетная разметка уровней разработчиков")
+    parser.add_argument("inputs", nargs="+", type=Path, help="CSV-файлы с резюме")
+    parser.add_argument("-o", "--output", type=Path, default=Path("levels.csv"),
+                        help="Выходной файл .csv или .parquet")
+    parser.add_argument("--model", type=Path, default=DEFAULT_MODEL_PATH, help="Путь к model.pkl")
+    parser.add_argument("--workers", type=int, default=None, help="Число процессов (по умолчанию — число ядер)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Строк в одной порции")
+    add_threshold_arguments(parser)
+    parser.add_argument("--review-output", type=Path, default=None,
+                        help="Файл для строк ниже порога уверенности (.csv или .parquet)")
+    args = parser.parse_args()
+    
+    try:
+        thresholds = parse_thresholds(args)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    missing = [p for p in args.inputs if not p.exists()]
+    if missing:
+        logger.error(f"Файлы не найдены: {', '.join(map(str, missing))}")
+        sys.exit(1)
+    
+    try:
+        with BatchScorer(args.model, args.workers, thresholds) as scorer:
+            logger.info(f"Разметка {len(args.inputs)} файлов, процессов: {scorer.workers}")
+            stats = scorer.run(args.inputs, args.output, args.chunksize, args.review_output)
+    except Exception as e:
+        logger.exception(f"Ошибка разметки: {e}")
+        sys.exit(1)
+    
+    logger.info(f"✓ Результат сохранён: {args.output}")
+    logger.info(f"  Прочитано строк: {stats.rows_read}")
+    logger.info(f"  Размечено разработчиков: {stats.rows_scored}")
+    if thresholds is not None:
+        logger.info(f"  Ниже порога уверенности: {stats.rows_uncertain}")
+    logger.info(f"  Время: {stats.seconds:.2f} с ({stats.rows_per_sec:,.0f} строк/с)")
+
+
+if __name__ == "__main__":
+    main()
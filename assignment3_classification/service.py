@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Локальный сервис разметки уровней разработчиков.
+
+Использование:
+    python service.py [--host 127.0.0.1] [--port 8765] [--workers N]
+
+Эндпоинты:
+    POST /score    — тело: CSV (text/csv) или JSON-список записей резюме;
+                     ответ: JSON {"results": [...], "stats": {...}};
+                     при заданном --min-confidence у строк ниже порога
+                     level_pred равен null
+    GET  /metrics  — накопленная пропускная способность и время перезагрузок модели
+    GET  /health   — проверка готовности
+
+Модель загружается один раз при старте в каждом процессе пула;
+сервис не обращается к внешней сети. Если файл модели перезаписан
+(например, повторным запуском train.py), новая версия загружается
+в фоне с новым пулом процессов и подставляется для новых запросов;
+старый пул останавливается после завершения уже начатых запросов.
+"""
+
+import io
+import sys
+import json
+import logging
+import argparse
+import threading
+import pandas as pd
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from registry import ModelRegistry
+from model import Thresholds
+from score import (
+    BatchScorer,
+    ScoringStats,
+    DEFAULT_MODEL_PATH,
+    DEFAULT_CHUNKSIZE,
+    add_threshold_arguments,
+    parse_thresholds,
+)
+
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+
+def load_scorer(model_path: Path, workers: int | None, thresholds: Thresholds = None) -> BatchScorer:
+    """Создать пул разметки и дождаться загрузки модели во всех процессах."""
+    scorer = BatchScorer(model_path, workers, thresholds)
+    try:
+        scorer.warm_up()
+    except Exception:
+        scorer.close()
+        raise
+    return scorer
+
+
+class ScoringService:
+    """Общее состояние сервиса: реестр модели и счётчики."""
+    
+    def __init__(self, registry: ModelRegistry, chunksize: int = DEFAULT_CHUNKSIZE) -> None:
+        self.registry = registry
+        self.chunksize = chunksize
+        self.requests = 0
+        self.totals = ScoringStats()
+        self._lock = threading.Lock()
+    
+    def score(self, df: pd.DataFrame) -> tuple[pd.DataFrame, ScoringStats]:
+        """Разметить резюме одного запроса и обновить счётчики."""
+        stats = ScoringStats()
+        chunks = (("request", df.iloc[i:i + self.chunksize]) for i in range(0, len(df), self.chunksize))
+        with self.registry.acquire() as scorer:
+            results = list(scorer.score_chunks(chunks, stats))
+        result = pd.concat(results, ignore_index=True) if results else pd.DataFrame()
+        with self._lock:
+            self.requests += 1
+            self.totals.rows_read += stats.rows_read
+            self.totals.rows_scored += stats.rows_scored
+            self.totals.rows_uncertain += stats.rows_uncertain
+            self.totals.chunks += stats.chunks
+            self.totals.seconds += stats.seconds
+        return result, stats
+    
+    def metrics(self) -> dict:
+        with self._lock:
+            metrics = {"requests": self.requests, **self.totals.as_dict()}
+        metrics["model"] = self.registry.metrics()
+        return metrics
+
+
+def make_handler(service: ScoringService) -> type[BaseHTTPRequestHandler]:
+    """Создать класс обработчика HTTP-запросов, привязанный к сервису."""
+    
+    class Handler(BaseHTTPRequestHandler):
+        def _send_json(self, status: int, payload: dict) -> None:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def do_GET(self) -> None:
+            if self.path == "/health":
+                self._send_json(200, {"status": "ok"})
+            elif self.path == "/metrics":
+                self._send_json(200, service.metrics())
+            else:
+                self._send_json(404, {"error": "not found"})
+        
+        def do_POST(self) -> None:
+            if self.path != "/score":
+                self._send_json(404, {"error": "not found"})
+                return
+            length = int(self.headers.get("Content-Length", 0))
+            raw = self.rfile.read(length).decode("utf-8")
+            try:
+                if "json" in self.headers.get("Content-Type", ""):
+                    df = pd.DataFrame(json.loads(raw))
+                else:
+                    df = pd.read_csv(io.StringIO(raw))
+                result, stats = service.score(df)
+            except Exception as e:
+                logger.exception(f"Ошибка разметки запроса: {e}")
+                self._send_json(400, {"error": str(e)})
+                return
+            result = result.astype(object).where(result.notna(), None)
+            self._send_json(200, {
+                "results": result.to_dict(orient="records"),
+                "stats": stats.as_dict(),
+            })
+        
+        def log_message(self, format: str, *args) -> None:
+            logger.info(format % args)
+    
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Локальный сервис разметки уровней разработчиков")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--model", type=Path, default=DEFAULT_MODEL_PATH, help="Путь к model.pkl")
+    parser.add_argument("--workers", type=int, default=None, help="Число процессов (по умолчанию — число ядер)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Строк в одной порции")
+    parser.add_argument(
+        "--reload-interval",
+        type=float,
+        default=2.0,
+        help="Период проверки файла модели на обновление, секунды"
+    )
+    add_threshold_arguments(parser)
+    args = parser.parse_args()
+    
+    try:
+        thresholds = parse_thresholds(args)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    try:
+        registry = ModelRegistry(
+            args.model,
+            loader=lambda path: load_scorer(path, args.workers, thresholds),
+            closer=BatchScorer.close,
+            poll_interval=args.reload_interval
+        ).start()
+    except Exception as e:
+        logger.error(f"Ошибка загрузки модели: {e}")
+        sys.exit(1)
+    
+    service = ScoringService(registry, args.chunksize)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    with registry.acquire() as scorer:
+        workers = scorer.workers
+    logger.info(f"Сервис запущен: http://{args.host}:{args.port} (процессов: {workers})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Остановка сервиса")
+    finally:
+        server.server_close()
+        registry.close()
+
+
+if __name__ == "__main__":
+    main()
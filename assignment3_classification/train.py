@@ -5,16 +5,14 @@
 
 import sys
 import logging
+import argparse
 import numpy as np
 import pandas as pd
 from pathlib import Path
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.metrics import classification_report, confusion_matrix
 from sklearn.model_selection import train_test_split
-from model import DeveloperLevelClassifier
+from metrics import ClassificationMetrics
+from model import DeveloperLevelClassifier, CityEncoder
+from reports import LABELS, REPORT_DATA_NAME, save_report_data, render_reports, render_in_background
 
 
 logging.basicConfig(
@@ -26,40 +24,29 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def plot_class_balance(y: np.ndarray, output_path: Path) -> None:
-    levels, counts = np.unique(y, return_counts=True)
-    plt.figure(figsize=(8, 5))
-    sns.barplot(x=levels, y=counts, palette="viridis")
-    plt.title("Баланс классов: распределение уровней разработчиков")
-    plt.xlabel("Уровень")
-    plt.ylabel("Количество резюме")
-    for i, v in enumerate(counts):
-        plt.text(i, v + 5, str(v), ha="center", va="bottom")
-    plt.tight_layout()
-    plt.savefig(output_path, dpi=150)
-    plt.close()
-
-
-def plot_confusion_matrix(y_true: np.ndarray, y_pred: np.ndarray, output_path: Path) -> None:
-    cm = confusion_matrix(y_true, y_pred, labels=["junior", "middle", "senior"])
-    plt.figure(figsize=(8, 6))
-    sns.heatmap(
-        cm,
-        annot=True,
-        fmt="d",
-        cmap="Blues",
-        xticklabels=["junior", "middle", "senior"],
-        yticklabels=["junior", "middle", "senior"]
-    )
-    plt.title("Матрица ошибок классификатора")
-    plt.ylabel("Истинный уровень")
-    plt.xlabel("Предсказанный уровень")
-    plt.tight_layout()
-    plt.savefig(output_path, dpi=150)
-    plt.close()
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Обучение классификатора уровней разработчиков")
+    parser.add_argument("--tune", action="store_true",
+                        help="Подобрать гиперпараметры кросс-валидацией перед обучением")
+    parser.add_argument("--search", choices=["random", "halving"], default="random",
+                        help="Метод поиска: случайный или successive halving")
+    parser.add_argument("--n-iter", type=int, default=20, help="Число проверяемых конфигураций")
+    parser.add_argument("--folds", type=int, default=5, help="Число фолдов кросс-валидации")
+    parser.add_argument("--jobs", type=int, default=None, help="Число процессов (по умолчанию — число ядер)")
+    parser.add_argument("--latency-budget-us", type=float, default=None,
+                        help="Максимальное время предсказания, мкс на строку")
+    parser.add_argument("--reports", choices=["background", "inline", "none"], default="background",
+                        help="Построение графиков: в фоновом процессе, сразу или не строить "
+                             "(данные отчётов сохраняются всегда; построить позже: python reports.py)")
+    parser.add_argument("--city-vocabulary", default=None,
+                        help="JSON-словарь городов из задания №1 (app.py --city-vocabulary); "
+                             "по умолчанию словарь строится по обучающим данным")
+    return parser.parse_args()
 
 
 def main() -> None:
+    args = parse_args()
+    
     # Автоматический поиск hh.csv в корне репозитория
     possible_paths = [
         Path("../hh.csv"),
@@ -81,7 +68,16 @@ def main() -> None:
     logger.info(f"Загрузка данных из: {csv_path}")
     df = pd.read_csv(csv_path)
     
-    classifier = DeveloperLevelClassifier()
+    city_encoder = None
+    if args.city_vocabulary:
+        try:
+            city_encoder = CityEncoder.load(args.city_vocabulary)
+        except (OSError, ValueError) as e:
+            logger.error(f"Не удалось загрузить словарь городов: {e}")
+            sys.exit(1)
+        logger.info(f"Словарь городов: {args.city_vocabulary} ({len(city_encoder.vocabulary_)} городов)")
+    
+    classifier = DeveloperLevelClassifier(city_encoder)
     df_labeled = classifier.label_levels(df)
     logger.info(f"Найдено {len(df_labeled)} IT-резюме")
     
@@ -94,47 +90,80 @@ def main() -> None:
     X, y = classifier.prepare_features(df_labeled)
     
     # Разделение
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y,
+    X_train, X_test, y_train, y_test, idx_train, _ = train_test_split(
+        X, y, np.arange(len(y)),
         test_size=0.2,
         random_state=42,
         stratify=y
     )
     
+    # Подбор гиперпараметров (только на обучающей части)
+    params = None
+    if args.tune:
+        from tuning import run_search, select_best
+        results = run_search(
+            df_labeled.iloc[idx_train],
+            method=args.search,
+            n_iter=args.n_iter,
+            n_folds=args.folds,
+            jobs=args.jobs,
+            city_encoder=city_encoder,
+            latency_budget_us=args.latency_budget_us
+        )
+        tuning_path = Path("assignment3_classification/reports/tuning.csv")
+        tuning_path.parent.mkdir(exist_ok=True)
+        results.to_csv(tuning_path, index=False)
+        logger.info(f"Результаты подбора сохранены: {tuning_path}")
+        try:
+            params = select_best(results, args.latency_budget_us)
+        except ValueError as e:
+            logger.error(f"Подбор гиперпараметров: {e}")
+            sys.exit(1)
+        logger.info(f"Лучшие гиперпараметры: {params}")
+    
     # Обучение
-    classifier.train(X_train, y_train)
+    classifier.train(X_train, y_train, params)
     
-    # Оценка
+    # Оценка: все метрики и бутстреп-интервалы за один проход по предсказаниям
     y_pred = classifier.predict(X_test)
-    report = classification_report(
-        y_test,
-        y_pred,
-        target_names=["junior", "middle", "senior"],
-        digits=3
-    )
+    evaluation = ClassificationMetrics(LABELS).update(y_test, y_pred)
+    metrics = evaluation.compute()
+    intervals = evaluation.confidence_intervals()
     logger.info("\nОтчёт о классификации:")
-    logger.info("\n" + report)
+    logger.info("\n" + evaluation.format_report(digits=3))
     
     # Сохранение
     model_path = Path("assignment3_classification/resources/model.pkl")
     classifier.save(model_path)
     logger.info(f"Модель сохранена: {model_path}")
     
-    # Графики
+    # Оценка работоспособности (ключевой метрик — weighted F1)
+    f1_weighted = metrics["f1_weighted"]
+    accuracy = metrics["accuracy"]
+    
+    # Данные для отчётов (графики строятся отдельно, см. reports.py)
     reports_dir = Path("assignment3_classification/reports")
-    reports_dir.mkdir(exist_ok=True)
-    plot_class_balance(y, reports_dir / "class_balance.png")
-    plot_confusion_matrix(y_test, y_pred, reports_dir / "confusion_matrix.png")
-    logger.info(f"Графики сохранены в: {reports_dir}")
+    report_data_path = reports_dir / REPORT_DATA_NAME
+    save_report_data(
+        report_data_path,
+        y,
+        evaluation.confusion_matrix(),
+        {**metrics, "confidence_intervals": intervals}
+    )
+    logger.info(f"Данные отчётов сохранены: {report_data_path}")
     
-    # Оценка работоспособности (ключевой метрик — weighted F1)
-    from sklearn.metrics import f1_score
-    f1_weighted = f1_score(y_test, y_pred, average="weighted")
-    accuracy = (y_pred == y_test).mean()
+    if args.reports == "inline":
+        render_reports(report_data_path)
+        logger.info(f"Графики сохранены в: {reports_dir}")
+    elif args.reports == "background":
+        render_in_background(report_data_path)
+        logger.info(f"Графики строятся в фоне и появятся в: {reports_dir}")
     
     logger.info("\nОценка работоспособности:")
-    logger.info(f"  • Accuracy: {accuracy:.1%}")
-    logger.info(f"  • Weighted F1-score: {f1_weighted:.3f}")
+    low, high = intervals["accuracy"]
+    logger.info(f"  • Accuracy: {accuracy:.1%} (95% ДИ: {low:.1%} – {high:.1%})")
+    low, high = intervals["f1_weighted"]
+    logger.info(f"  • Weighted F1-score: {f1_weighted:.3f} (95% ДИ: {low:.3f} – {high:.3f})")
     logger.info(f"  • Базовый уровень (случайное угадывание): ~33%")
     logger.info(f"  • Вывод: модель работает ({f1_weighted:.1%} > 33%) — PoC успешен")
 
@@ -0,0 +1,243 @@
+"""
+Подбор гиперпараметров случайного леса.
+
+Стратифицированная k-fold кросс-валидация со случайным поиском или
+последовательным делением пополам (successive halving). Матрицы признаков
+каждого фолда строятся один раз и кешируются на диске, поэтому предобработка
+не повторяется для каждой конфигурации; фолды и конфигурации считаются
+параллельно в пуле процессов.
+"""
+
+import math
+import json
+import time
+import pickle
+import hashlib
+import logging
+import numpy as np
+import pandas as pd
+import sklearn
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from sklearn.metrics import f1_score
+from sklearn.model_selection import StratifiedKFold
+from model import DeveloperLevelClassifier, DEFAULT_FOREST_PARAMS, DEFAULT_CITY_MIN_FREQUENCY, CityEncoder
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / ".cache" / "folds"
+
+# Пространство поиска гиперпараметров
+PARAM_SPACE = {
+    "n_estimators": [50, 100, 150, 200, 300],
+    "max_depth": [None, 8, 12, 15, 20, 30],
+    "min_samples_leaf": [1, 2, 4, 8],
+    "max_features": ["sqrt", "log2", 0.5],
+}
+
+FEATURE_COLUMNS = ["experience_years", "salary_num", "city", "level"]
+
+
+def sample_configs(n_iter: int, seed: int = 42) -> list[dict]:
+    """Выбрать n_iter различных конфигураций (первая — текущая по умолчанию)."""
+    rng = np.random.default_rng(seed)
+    total = math.prod(len(v) for v in PARAM_SPACE.values())
+    configs = [dict(DEFAULT_FOREST_PARAMS)]
+    seen = {json.dumps(configs[0], sort_keys=True)}
+    while len(configs) < min(n_iter, total):
+        params = {k: v[rng.integers(len(v))] for k, v in PARAM_SPACE.items()}
+        params = {k: (v.item() if isinstance(v, np.generic) else v) for k, v in params.items()}
+        key = json.dumps(params, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            configs.append(params)
+    return configs
+
+
+class FoldCache:
+    """
+    Дисковый кеш преобразованных матриц признаков по фолдам.
+    
+    Препроцессор обучается только на обучающей части фолда (без утечки
+    в валидацию). Ключ кеша зависит от содержимого данных, числа фолдов,
+    seed, параметров кодирования городов и версии scikit-learn.
+    """
+    
+    def __init__(self, df: pd.DataFrame, n_folds: int = 5, seed: int = 42,
+                 cache_dir: str | Path = DEFAULT_CACHE_DIR,
+                 city_encoder: CityEncoder | None = None) -> None:
+        self.df = df
+        self.n_folds = n_folds
+        self.seed = seed
+        self.city_encoder = city_encoder or CityEncoder(min_frequency=DEFAULT_CITY_MIN_FREQUENCY)
+        digest = hashlib.sha1(
+            pd.util.hash_pandas_object(df[FEATURE_COLUMNS], index=False).values.tobytes()
+        )
+        digest.update(f"{n_folds}:{seed}:{sklearn.__version__}".encode())
+        digest.update(json.dumps(self.city_encoder.get_params(), sort_keys=True, ensure_ascii=False).encode())
+        self.dir = Path(cache_dir) / digest.hexdigest()[:16]
+    
+    def fold_paths(self) -> list[dict[str, str]]:
+        """Вернуть пути к массивам фолдов, построив их при отсутствии в кеше."""
+        paths = [
+            {name: str(self.dir / f"fold{i}_{name}.npy") for name in ("X_train", "y_train", "X_val", "y_val")}
+            for i in range(self.n_folds)
+        ]
+        if all(Path(p).exists() for fold in paths for p in fold.values()):
+            logger.info(f"Фолды взяты из кеша: {self.dir}")
+            return paths
+        
+        self.dir.mkdir(parents=True, exist_ok=True)
+        y = np.asarray(self.df["level"], dtype=object)
+        splitter = StratifiedKFold(n_splits=self.n_folds, shuffle=True, random_state=self.seed)
+        for fold, (train_idx, val_idx) in zip(paths, splitter.split(np.zeros(len(y)), y)):
+            preprocessor = DeveloperLevelClassifier.build_preprocessor(self.city_encoder)
+            arrays = {
+                "X_train": preprocessor.fit_transform(self.df.iloc[train_idx]),
+                "y_train": y[train_idx].astype(str),
+                "X_val": preprocessor.transform(self.df.iloc[val_idx]),
+                "y_val": y[val_idx].astype(str),
+            }
+            for name, array in arrays.items():
+                np.save(fold[name], array)
+        logger.info(f"Фолды построены и сохранены в кеш: {self.dir}")
+        return paths
+
+
+def _evaluate(params: dict, fold: dict[str, str], fraction: float, seed: int) -> dict:
+    """Обучить и оценить одну конфигурацию на одном фолде (в рабочем процессе)."""
+    X_train = np.load(fold["X_train"], mmap_mode="r")
+    y_train = np.load(fold["y_train"])
+    X_val = np.load(fold["X_val"], mmap_mode="r")
+    y_val = np.load(fold["y_val"])
+    
+    if fraction < 1.0:
+        rng = np.random.default_rng(seed)
+        n = max(int(len(y_train) * fraction), len(np.unique(y_train)))
+        idx = np.sort(rng.permutation(len(y_train))[:n])
+        X_train, y_train = X_train[idx], y_train[idx]
+    
+    # Параллельность обеспечивает пул процессов — внутри процесса один поток,
+    # иначе время предсказания замеряется при переподписке ядер
+    classifier = DeveloperLevelClassifier(n_jobs=1)
+    start = time.perf_counter()
+    classifier.train(np.asarray(X_train), y_train, params)
+    fit_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    y_pred = classifier.predict(np.asarray(X_val))
+    predict_seconds = time.perf_counter() - start
+    
+    return {
+        "f1_weighted": f1_score(y_val, y_pred, average="weighted"),
+        "fit_s": fit_seconds,
+        "predict_us_per_row": predict_seconds / len(y_val) * 1e6,
+        # Деревья живут в буферах Cython, невидимых для tracemalloc, поэтому
+        # память модели оценивается по размеру сериализованного леса
+        "model_mb": len(pickle.dumps(classifier.model)) / 2**20,
+    }
+
+
+def _run_rung(executor: ProcessPoolExecutor, configs: list[dict], folds: list[dict],
+              fraction: float, seed: int, rung: int) -> pd.DataFrame:
+    """Оценить все конфигурации на всех фолдах и усреднить по фолдам."""
+    tasks = [(i, f, params, fold) for i, params in enumerate(configs) for f, fold in enumerate(folds)]
+    futures = [executor.submit(_evaluate, params, fold, fraction, seed + f) for _, f, params, fold in tasks]
+    rows = [{"config": i, "fold": f, **future.result()} for (i, f, _, _), future in zip(tasks, futures)]
+    
+    per_fold = pd.DataFrame(rows)
+    summary = per_fold.groupby("config").agg(
+        f1_mean=("f1_weighted", "mean"),
+        f1_std=("f1_weighted", "std"),
+        fit_s=("fit_s", "mean"),
+        predict_us_per_row=("predict_us_per_row", "mean"),
+        model_mb=("model_mb", "mean"),
+    ).reset_index()
+    summary["params"] = [json.dumps(configs[i], sort_keys=True) for i in summary["config"]]
+    summary["rung"] = rung
+    summary["fraction"] = fraction
+    
+    for row in summary.itertuples():
+        logger.info(
+            f"  [{rung}] {row.params}: F1={row.f1_mean:.3f}±{row.f1_std:.3f}, "
+            f"fit={row.fit_s:.2f} с, predict={row.predict_us_per_row:.1f} мкс/строку, "
+            f"модель={row.model_mb:.1f} МБ"
+        )
+    return summary
+
+
+def run_search(df: pd.DataFrame, method: str = "random", n_iter: int = 20, n_folds: int = 5,
+               jobs: int | None = None, eta: int = 3, seed: int = 42,
+               cache_dir: str | Path = DEFAULT_CACHE_DIR,
+               city_encoder: CityEncoder | None = None,
+               latency_budget_us: float | None = None) -> pd.DataFrame:
+    """
+    Подобрать гиперпараметры кросс-валидацией.
+    
+    Аргументы:
+        df: Размеченные резюме со столбцами experience_years, salary_num, city, level
+        method: "random" — все конфигурации на полных данных;
+                "halving" — successive halving по доле обучающей выборки
+        n_iter: Число проверяемых конфигураций
+        n_folds: Число фолдов стратифицированной кросс-валидации
+        jobs: Число процессов (по умолчанию — число ядер)
+        eta: Во сколько раз сокращается число конфигураций на каждом шаге halving
+        city_encoder: Кодировщик городов (по умолчанию — как в DeveloperLevelClassifier)
+        latency_budget_us: Бюджет времени предсказания на строку: в halving
+                на следующий шаг проходят только укладывающиеся в него конфигурации
+    
+    Возвращает:
+        Таблицу результатов: по строке на конфигурацию и шаг поиска
+    """
+    if method not in ("random", "halving"):
+        raise ValueError(f"Неизвестный метод поиска: {method}")
+    
+    folds = FoldCache(df, n_folds, seed, cache_dir, city_encoder).fold_paths()
+    configs = sample_configs(n_iter, seed)
+    logger.info(f"Поиск ({method}): {len(configs)} конфигураций × {n_folds} фолдов")
+    
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        if method == "random":
+            results.append(_run_rung(executor, configs, folds, 1.0, seed, 0))
+        else:
+            n_rungs = max(math.ceil(math.log(len(configs), eta)), 0) + 1
+            candidates = list(range(len(configs)))
+            for rung in range(n_rungs):
+                fraction = float(eta) ** (rung - n_rungs + 1)
+                summary = _run_rung(executor, [configs[i] for i in candidates], folds, fraction, seed, rung)
+                summary["config"] = [candidates[i] for i in summary["config"]]
+                results.append(summary)
+                keep = max(math.ceil(len(candidates) / eta), 1)
+                ranked = summary
+                if latency_budget_us is not None:
+                    ranked = summary[summary["predict_us_per_row"] <= latency_budget_us]
+                    if ranked.empty:
+                        logger.warning(f"На шаге {rung} ни одна конфигурация не укладывается "
+                                       f"в {latency_budget_us} мкс/строку")
+                        break
+                candidates = ranked.nlargest(keep, "f1_mean")["config"].tolist()
+                if len(summary) == 1:
+                    break
+    
+    return pd.concat(results, ignore_index=True)
+
+
+def select_best(results: pd.DataFrame, latency_budget_us: float | None = None) -> dict:
+    """
+    Выбрать конфигурацию с наибольшим weighted F1 на последнем шаге поиска.
+    
+    Если задан бюджет задержки, рассматриваются только конфигурации,
+    укладывающиеся в него по времени предсказания на строку, — на самом
+    большом шаге (доле данных), до которого такие конфигурации дошли.
+    
+    Вызывает:
+        ValueError: Если ни одна конфигурация не укладывается в бюджет
+    """
+    if latency_budget_us is not None:
+        results = results[results["predict_us_per_row"] <= latency_budget_us]
+        if results.empty:
+            raise ValueError(f"Ни одна конфигурация не укладывается в {latency_budget_us} мкс/строку")
+    final = results[results["fraction"] == results["fraction"].max()]
+    best = final.loc[final["f1_mean"].idxmax()]
+    return json.loads(best["params"])
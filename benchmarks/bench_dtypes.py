@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк типов столбцов: object против string[pyarrow] и category.
+
+Использование:
+    python bench_dtypes.py [ЧИСЛО_СТРОК]
+
+Синтетический CSV записывается во временный каталог и обрабатывается
+DataPipeline дважды: с текстом в object (как раньше) и в string[pyarrow].
+Сравниваются память сырого DataFrame, время чтения и полной обработки;
+результаты (x_data, y_data) должны совпасть. Отдельно — память столбца
+городов как строк object и как category.
+"""
+
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "assignment1_preprocessing"))
+
+from pipeline import DataPipeline  # noqa: E402
+from handlers.city_encoder import extract_cities  # noqa: E402
+from synthetic import make_resumes  # noqa: E402
+
+
+def best_of(fn, repeats: int = 3) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def megabytes(obj: pd.DataFrame | pd.Series) -> float:
+    usage = obj.memory_usage(deep=True)
+    return float(np.sum(usage)) / 2**20
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) == 2 else 200_000
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "synthetic_hh.csv"
+        make_resumes(n).to_csv(csv_path)
+        
+        results = {}
+        for arrow in (False, True):
+            pipeline = DataPipeline(max_workers=1, arrow_strings=arrow)
+            try:
+                raw = pipeline.read(csv_path)
+                results[arrow] = {
+                    "memory": megabytes(raw),
+                    "read": best_of(lambda: pipeline.read(csv_path)),
+                    "process": best_of(lambda: pipeline.process(csv_path)),
+                    "output": pipeline.process(csv_path),
+                    "cities": raw["Город"],
+                }
+            finally:
+                pipeline.close()
+    
+    before, after = results[False], results[True]
+    same = all(np.array_equal(a, b) for a, b in zip(before["output"], after["output"]))
+    
+    print(f"Строк: {n:,}")
+    print(f"{'':<22}{'object':>10}{'string[pyarrow]':>18}")
+    print(f"{'Сырые столбцы, МБ':<22}{before['memory']:>10.1f}{after['memory']:>18.1f}")
+    print(f"{'Чтение CSV, с':<22}{before['read']:>10.3f}{after['read']:>18.3f}")
+    print(f"{'Полная обработка, с':<22}{before['process']:>10.3f}{after['process']:>18.3f}")
+    print(f"Ускорение обработки: ×{before['process'] / after['process']:.1f}, "
+          f"память: ×{before['memory'] / after['memory']:.1f} меньше")
+    print(f"Результаты совпадают: {'да' if same else 'НЕТ'}")
+    
+    cities = extract_cities(after["cities"])
+    print(f"Столбец городов: object {megabytes(cities.astype(object)):.1f} МБ, "
+          f"category {megabytes(cities):.2f} МБ ({len(cities.cat.categories)} категорий)")
+
+
+if __name__ == "__main__":
+    main()
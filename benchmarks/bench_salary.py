@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк парсинга зарплат: построчный парсер против векторного CurrencyTable.
+
+Использование:
+    python bench_salary.py [ЧИСЛО_СТРОК]
+
+Построчный парсер — исходная реализация SalaryHandler (курсы KZT/EUR/USD
+зашиты в код, валюта определяется проверками подстрок в каждой строке).
+"""
+
+import re
+import sys
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "assignment1_preprocessing"))
+
+from handlers.currency import CurrencyTable  # noqa: E402
+from synthetic import make_resumes  # noqa: E402
+
+
+def parse_salary_rowwise(val) -> float | None:
+    """Исходный построчный парсер SalaryHandler."""
+    if pd.isna(val) or not isinstance(val, str):
+        return None
+    val_lower = val.lower()
+    if "kzt" in val_lower:
+        rate = 0.021
+    elif "eur" in val_lower or "€" in val_lower:
+        rate = 90.0
+    elif "usd" in val_lower or "$" in val_lower:
+        rate = 85.0
+    else:
+        rate = 1.0
+    match = re.search(r"(\d[\d\s\xa0]*)", val)
+    if match:
+        clean = re.sub(r"[\s\xa0]", "", match.group(1))
+        if clean.isdigit():
+            return float(clean) * rate
+    return None
+
+
+def best_of(fn, repeats: int = 3) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) == 2 else 200_000
+    salaries = make_resumes(n)["ЗП"]
+    table = CurrencyTable.from_csv()
+    
+    rowwise = salaries.apply(parse_salary_rowwise).astype(float)
+    vectorized = table.convert(salaries)
+    
+    # Сверка на валютах, известных исходному парсеру
+    codes = table.classify(salaries.dropna())
+    legacy = codes.isin(["RUB", "KZT", "EUR", "USD"]).reindex(salaries.index, fill_value=True)
+    mismatch = ~np.isclose(rowwise[legacy], vectorized[legacy], equal_nan=True)
+    
+    t_rowwise = best_of(lambda: salaries.apply(parse_salary_rowwise))
+    t_vectorized = best_of(lambda: table.convert(salaries))
+    
+    print(f"Строк: {n:,}")
+    print(f"Курсы на дату: {table.as_of}")
+    print(f"Построчный парсер: {t_rowwise:.3f} с ({n / t_rowwise:,.0f} строк/с)")
+    print(f"Векторный парсер:  {t_vectorized:.3f} с ({n / t_vectorized:,.0f} строк/с)")
+    print(f"Ускорение: ×{t_rowwise / t_vectorized:.1f}")
+    print(f"Расхождений на RUB/KZT/EUR/USD: {int(mismatch.sum())}")
+    print("Распределение валют:")
+    print(codes.value_counts().to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Проверка бюджетов производительности по этапам всех трёх заданий.
+
+Использование:
+    python perf_budget.py                     # сверить с perf_budgets.json
+    python perf_budget.py --tolerance 0.3     # допустимое замедление +30%
+    python perf_budget.py --stage preprocess --stage regression_fit
+    python perf_budget.py --update            # записать новые бюджеты
+
+На фиксированном синтетическом датасете (synthetic.py, seed 42) по очереди
+выполняются этапы: предобработка DataPipeline (в конфигурации по умолчанию
+и последовательно), обучение и предсказание регрессии, разметка, обучение
+и предсказание классификатора. Для каждого этапа измеряются время
+(медиана --repeats запусков) и прирост пиковой памяти процесса (RSS)
+в отдельном дочернем процессе — вместе с буферами numpy, деревьями sklearn
+и пулом памяти Arrow, которых не видит tracemalloc. Замер памяти требует
+os.fork (Linux, macOS).
+
+Этап не проходит, если время превышает сохранённое больше чем на
+--tolerance, а пиковая память — больше чем на --memory-tolerance.
+Бюджеты времени масштабируются на отношение калибровочного замера
+текущей машины к сохранённому, поэтому файл бюджетов переносим между
+машинами. Код завершения 1 — есть этапы сверх бюджета или без бюджета.
+Внешние сервисы и реальный hh.csv не нужны.
+"""
+
+import gc
+import os
+import ctypes
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import statistics
+import traceback
+import importlib.util
+import numpy as np
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "assignment1_preprocessing"))
+
+from pipeline import DataPipeline  # noqa: E402
+from synthetic import make_resumes  # noqa: E402
+
+
+DEFAULT_BUDGETS_PATH = Path(__file__).resolve().parent / "perf_budgets.json"
+# Версия 2: память — прирост пикового RSS (в версии 1 — пик tracemalloc)
+BUDGETS_FORMAT_VERSION = 2
+DEFAULT_ROWS = 20_000
+DEFAULT_REPEATS = 5
+DEFAULT_TOLERANCE = 0.75
+DEFAULT_MEMORY_TOLERANCE = 0.10
+# Запусков для пиковой памяти (берётся минимум: пик зависит от момента
+# сборки мусора и порядка работы потоков)
+MEMORY_REPEATS = 3
+# Запас на шум таймера для этапов в десятки миллисекунд и на разброс пика
+# памяти (RSS растёт страницами и аренами аллокатора)
+MIN_SECONDS_SLACK = 0.02
+MIN_MEMORY_SLACK_MB = 2.0
+
+
+def _load_module(name: str, path: Path):
+    """
+    Загрузить модуль по пути под уникальным именем.
+    
+    У заданий №2 и №3 модули называются одинаково (model.py), поэтому
+    обычный импорт через sys.path вернул бы один и тот же модуль.
+    """
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+regression = _load_module("regression_model", ROOT / "assignment2_regression" / "model.py")
+classification = _load_module("classification_model", ROOT / "assignment3_classification" / "model.py")
+
+
+# --- Этапы ---
+# Каждый этап получает общий словарь ctx с результатами предыдущих этапов
+# и кладёт в него свои; повторный запуск этапа перезаписывает те же ключи.
+
+def _preprocess(ctx: dict, max_workers: int | None) -> None:
+    pipeline = DataPipeline(max_workers=max_workers)
+    try:
+        ctx["x"], ctx["y"] = pipeline.process(ctx["csv_path"])
+    finally:
+        pipeline.close()
+
+
+def stage_preprocess(ctx: dict) -> None:
+    # Конфигурация по умолчанию — та, что запускает app.py
+    _preprocess(ctx, max_workers=None)
+
+
+def stage_preprocess_serial(ctx: dict) -> None:
+    # Обработчики по очереди: регрессия в самих обработчиках без влияния планировщика
+    _preprocess(ctx, max_workers=1)
+
+
+def stage_regression_fit(ctx: dict) -> None:
+    model = regression.LinearRegressionModel()
+    model.fit(ctx["x"], ctx["y"])
+    ctx["regressor"] = model
+
+
+def stage_regression_predict(ctx: dict) -> None:
+    ctx["salary_pred"] = ctx["regressor"].predict(ctx["x"])
+
+
+def stage_classifier_label(ctx: dict) -> None:
+    ctx["labeled"] = classification.DeveloperLevelClassifier().label_levels(ctx["df"])
+
+
+def stage_classifier_train(ctx: dict) -> None:
+    classifier = classification.DeveloperLevelClassifier(n_jobs=1)
+    X, y = classifier.prepare_features(ctx["labeled"].copy())
+    classifier.train(X, y)
+    ctx["classifier"] = classifier
+
+
+def stage_classifier_predict(ctx: dict) -> None:
+    ctx["scored"] = ctx["classifier"].score(ctx["df"])
+
+
+STAGES: dict[str, Callable[[dict], None]] = {
+    "preprocess": stage_preprocess,
+    "preprocess_serial": stage_preprocess_serial,
+    "regression_fit": stage_regression_fit,
+    "regression_predict": stage_regression_predict,
+    "classifier_label": stage_classifier_label,
+    "classifier_train": stage_classifier_train,
+    "classifier_predict": stage_classifier_predict,
+}
+
+
+# --- Замеры ---
+
+def calibrate(repeats: int = 7) -> float:
+    """
+    Время фиксированной эталонной нагрузки (цикл Python и сортировка numpy).
+    
+    Отношение к сохранённому значению показывает, во сколько раз текущая
+    машина медленнее той, на которой записаны бюджеты. Первый запуск
+    (прогрев) не учитывается, из остальных берётся медиана — как для этапов.
+    """
+    values = np.random.default_rng(0).random(2_000_000)
+    times = []
+    for _ in range(repeats + 1):
+        start = time.perf_counter()
+        sum(i * i for i in range(1_000_000))
+        np.sort(values)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times[1:])
+
+
+def _max_rss_bytes() -> int:
+    """Пиковый RSS текущего процесса в байтах."""
+    import resource
+    
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux сообщает ru_maxrss в килобайтах, macOS — в байтах
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _release_free_memory() -> None:
+    """
+    Вернуть ОС свободную память аллокаторов (malloc и пула Arrow).
+    
+    Иначе прирост RSS этапа зависел бы от того, успели ли аллокаторы
+    родителя отдать память, освобождённую предыдущими этапами.
+    """
+    gc.collect()
+    try:
+        import pyarrow as pa
+        
+        pa.default_memory_pool().release_unused()
+    except ImportError:
+        pass
+    try:
+        ctypes.CDLL(None).malloc_trim(0)
+    except (OSError, AttributeError):
+        # malloc_trim есть только в glibc
+        pass
+
+
+def _rss_growth(fn: Callable[[dict], None], ctx: dict) -> int:
+    """
+    Прирост пикового RSS за один запуск этапа в дочернем процессе (fork).
+    
+    Пиковый RSS дочернего процесса начинается с текущего RSS, а не с пика
+    родителя, поэтому разность — память самого этапа. Изменения ctx
+    в родителя не попадают.
+    
+    Вызывает:
+        RuntimeError: Если этап в дочернем процессе завершился с ошибкой
+    """
+    _release_free_memory()
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            os.close(read_fd)
+            start = _max_rss_bytes()
+            fn(ctx)
+            os.write(write_fd, str(_max_rss_bytes() - start).encode())
+            status = 0
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            os._exit(status)
+    
+    os.close(write_fd)
+    with os.fdopen(read_fd) as pipe:
+        output = pipe.read()
+    _, status = os.waitpid(pid, 0)
+    if status != 0 or not output:
+        raise RuntimeError(f"Замер памяти: этап завершился с ошибкой (статус {status})")
+    return int(output)
+
+
+def measure(fn: Callable[[dict], None], ctx: dict, repeats: int) -> dict:
+    """
+    Замерить этап: прирост пикового RSS в дочерних процессах и медианное время.
+    
+    Возвращает:
+        {"seconds": ..., "peak_mb": ...}
+    """
+    peak = float("inf")
+    for _ in range(MEMORY_REPEATS):
+        peak = min(peak, _rss_growth(fn, ctx))
+    
+    times = []
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        fn(ctx)
+        times.append(time.perf_counter() - start)
+    return {"seconds": round(statistics.median(times), 4), "peak_mb": round(peak / 2**20, 2)}
+
+
+def run_stages(names: list[str], rows: int, repeats: int) -> dict[str, dict]:
+    """Выполнить этапы на синтетическом датасете из rows строк."""
+    # Этапы зависят от результатов предыдущих, поэтому выполняются все этапы
+    # до последнего запрошенного, а замеряются только запрошенные
+    last = max(list(STAGES).index(name) for name in names)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "synthetic_hh.csv"
+        df = make_resumes(rows)
+        df.to_csv(csv_path)
+        ctx = {"csv_path": csv_path, "df": df}
+        for name in list(STAGES)[:last + 1]:
+            if name in names:
+                results[name] = measure(STAGES[name], ctx, repeats)
+            else:
+                STAGES[name](ctx)
+    return results
+
+
+# --- Бюджеты ---
+
+def load_budgets(path: Path) -> dict | None:
+    """
+    Прочитать файл бюджетов (None — файла нет).
+    
+    Вызывает:
+        ValueError: Если файл записан другой версией формата
+    """
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        budgets = json.load(f)
+    version = budgets.get("format_version", 1)
+    if version > BUDGETS_FORMAT_VERSION:
+        raise ValueError(f"Формат бюджетов v{version} новее поддерживаемого v{BUDGETS_FORMAT_VERSION}")
+    if version < BUDGETS_FORMAT_VERSION:
+        raise ValueError(
+            f"Бюджеты записаны в формате v{version} (другой способ замера памяти); "
+            f"перезапишите их: python perf_budget.py --update"
+        )
+    return budgets
+
+
+def save_budgets(path: Path, results: dict[str, dict], rows: int, calibration: float, previous: dict | None) -> None:
+    """Записать бюджеты; этапы, которые не замерялись, сохраняются из previous."""
+    stages = dict(previous["stages"]) if previous and previous.get("rows") == rows else {}
+    if stages and previous.get("calibration_s"):
+        # Старые бюджеты приводятся к калибровке текущей машины
+        factor = calibration / previous["calibration_s"]
+        stages = {
+            name: {**budget, "seconds": round(budget["seconds"] * factor, 4)}
+            for name, budget in stages.items()
+        }
+    stages.update(results)
+    budgets = {
+        "format_version": BUDGETS_FORMAT_VERSION,
+        "rows": rows,
+        "calibration_s": round(calibration, 4),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "updated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "stages": {name: stages[name] for name in STAGES if name in stages},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(budgets, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def check_budgets(
+    results: dict[str, dict],
+    budgets: dict,
+    calibration: float,
+    tolerance: float,
+    memory_tolerance: float
+) -> list[str]:
+    """
+    Сравнить замеры с бюджетами и напечатать таблицу.
+    
+    Возвращает:
+        Список описаний нарушений (пустой — все этапы в бюджете)
+    """
+    factor = calibration / budgets["calibration_s"] if budgets.get("calibration_s") else 1.0
+    print(f"Калибровка: {calibration:.4f} с (машина ×{factor:.2f} относительно бюджетов)")
+    print(f"{'Этап':<22}{'время, с':>10}{'бюджет':>10}{'память, МБ':>13}{'бюджет':>10}  итог")
+    
+    failures = []
+    for name, result in results.items():
+        budget = budgets["stages"].get(name)
+        if budget is None:
+            print(f"{name:<22}{result['seconds']:>10.3f}{'—':>10}{result['peak_mb']:>13.1f}{'—':>10}  НЕТ БЮДЖЕТА")
+            failures.append(f"{name}: нет бюджета (запустите с --update)")
+            continue
+        time_limit = budget["seconds"] * factor * (1 + tolerance) + MIN_SECONDS_SLACK
+        memory_limit = budget["peak_mb"] * (1 + memory_tolerance) + MIN_MEMORY_SLACK_MB
+        problems = []
+        if result["seconds"] > time_limit:
+            problems.append(f"время {result['seconds']:.3f} с > {time_limit:.3f} с")
+        if result["peak_mb"] > memory_limit:
+            problems.append(f"память {result['peak_mb']:.1f} МБ > {memory_limit:.1f} МБ")
+        print(
+            f"{name:<22}{result['seconds']:>10.3f}{time_limit:>10.3f}"
+            f"{result['peak_mb']:>13.1f}{memory_limit:>10.1f}  {'СВЕРХ БЮДЖЕТА' if problems else 'ok'}"
+        )
+        failures.extend(f"{name}: {problem}" for problem in problems)
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Проверка бюджетов производительности по этапам")
+    parser.add_argument("--budgets", type=Path, default=DEFAULT_BUDGETS_PATH, help="Файл бюджетов JSON")
+    parser.add_argument("--update", action="store_true", help="Записать замеры как новые бюджеты")
+    parser.add_argument("--stage", action="append", choices=list(STAGES), default=None,
+                        help="Замерить только этот этап (можно повторять)")
+    parser.add_argument("--rows", type=int, default=None,
+                        help=f"Строк синтетического датасета (по умолчанию — как в бюджетах или {DEFAULT_ROWS})")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="Запусков для замера времени")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Допустимое превышение бюджета времени (0.75 — на 75%%)")
+    parser.add_argument("--memory-tolerance", type=float, default=DEFAULT_MEMORY_TOLERANCE,
+                        help="Допустимое превышение бюджета прироста пиковой памяти")
+    args = parser.parse_args()
+    
+    if not hasattr(os, "fork"):
+        parser.error("Замер пиковой памяти требует os.fork (Linux или macOS)")
+    try:
+        budgets = load_budgets(args.budgets)
+    except ValueError as e:
+        if not args.update:
+            parser.error(str(e))
+        # Несовместимые бюджеты перезаписываются целиком
+        budgets = None
+    if budgets is None and not args.update:
+        print(f"Файл бюджетов не найден: {args.budgets}. Запишите его: python perf_budget.py --update",
+              file=sys.stderr)
+        sys.exit(1)
+    
+    rows = args.rows or (budgets["rows"] if budgets else DEFAULT_ROWS)
+    if budgets is not None and not args.update and rows != budgets["rows"]:
+        parser.error(f"Бюджеты записаны для {budgets['rows']} строк, а не {rows}")
+    
+    names = args.stage or list(STAGES)
+    calibration = calibrate()
+    print(f"Синтетический датасет: {rows:,} строк, этапы: {', '.join(names)}")
+    results = run_stages(names, rows, args.repeats)
+    
+    if args.update:
+        save_budgets(args.budgets, results, rows, calibration, budgets)
+        for name, result in results.items():
+            print(f"{name:<22}{result['seconds']:>10.3f} с{result['peak_mb']:>10.1f} МБ")
+        print(f"Бюджеты сохранены: {args.budgets}")
+        return
+    
+    failures = check_budgets(results, budgets, calibration, args.tolerance, args.memory_tolerance)
+    if failures:
+        print("\nСверх бюджета:")
+        for failure in failures:
+            print(f"  • {failure}")
+        sys.exit(1)
+    print("\nВсе этапы в бюджете")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Генератор синтетического датасета в формате hh.csv.
+
+Использование:
+    python synthetic.py 100000 synthetic_hh.csv
+
+Столбцы и форматы строк повторяют выгрузку hh.ru (неразрывные пробелы,
+разные валюты, пропуски), поэтому датасет подходит для бенчмарков
+всех трёх заданий без доступа к реальным данным.
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+
+
+CITIES = [
+    "Москва", "Санкт-Петербург", "Moscow", "Новосибирск", "Екатеринбург",
+    "Казань", "Нижний Новгород", "Самара", "Омск", "Ростов-на-Дону",
+    "Уфа", "Красноярск", "Пермь", "Воронеж", "Волгоград", "Алматы", "Минск",
+]
+CITY_SUFFIXES = [
+    " , не готов к переезду , не готов к командировкам",
+    " , готов к переезду , готов к командировкам",
+    " , м. Тверская , не готов к переезду",
+    "",
+]
+TITLES = [
+    "Junior Python разработчик", "Senior Java developer", "Программист 1С",
+    "Middle frontend разработчик", "Ведущий программист", "Стажер-программист",
+    "Lead backend разработчик", "Инженер-программист", "Младший разработчик C#",
+    "Менеджер по продажам", "Системный администратор", "Бухгалтер",
+    "Водитель", "Тестировщик", "Главный инженер", "Оператор call-центра",
+]
+CURRENCIES = [
+    ("руб.", 1.0), ("KZT", 1 / 0.021), ("USD", 1 / 85.0), ("EUR", 1 / 90.0),
+    ("бел. руб.", 1 / 27.0), ("грн.", 1 / 2.2), ("сум", 1 / 0.0069),
+]
+CURRENCY_P = [0.85, 0.05, 0.03, 0.02, 0.02, 0.02, 0.01]
+
+
+def _group_thousands(value: int) -> str:
+    return f"{value:,}".replace(",", "\xa0")
+
+
+def make_resumes(n: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Сгенерировать n синтетических резюме.
+    
+    Аргументы:
+        n: Число строк
+        seed: Зерно генератора случайных чисел (одинаковый seed — одинаковые данные)
+    
+    Возвращает:
+        DataFrame со столбцами hh.csv
+    """
+    rng = np.random.default_rng(seed)
+    
+    age = rng.integers(18, 66, n)
+    gender = rng.choice(["Мужчина", "Женщина"], n)
+    age_word = np.where(age % 10 == 1, "год", np.where(np.isin(age % 10, [2, 3, 4]), "года", "лет"))
+    age_str = [f"{g} ,\xa0{a}\xa0{w} , родился 6 октября {2024 - a}" for g, a, w in zip(gender, age, age_word)]
+    
+    salary_rub = np.clip(rng.lognormal(11.3, 0.6, n), 5_000, 2_000_000)
+    currency = rng.choice(len(CURRENCIES), n, p=CURRENCY_P)
+    salary_str = []
+    for value, c in zip(salary_rub, currency):
+        label, per_rub = CURRENCIES[c]
+        amount = max(int(round(value * per_rub, -2)), 1)
+        salary_str.append(f"{_group_thousands(amount)} {label}")
+    
+    years = rng.integers(0, 35, n)
+    months = rng.integers(0, 12, n)
+    has_months = rng.random(n) < 0.7
+    experience = [
+        f"Опыт работы {y} лет {m} месяцев  Январь 2015 — настоящее время ООО «Компания» Должность"
+        if hm else f"Опыт работы {y} лет  Январь 2015 — настоящее время ООО «Компания» Должность"
+        for y, m, hm in zip(years, months, has_months)
+    ]
+    
+    city_weights = 1.0 / np.arange(1, len(CITIES) + 1)
+    city = rng.choice(CITIES, n, p=city_weights / city_weights.sum())
+    city_str = [c + CITY_SUFFIXES[i] for c, i in zip(city, rng.integers(0, len(CITY_SUFFIXES), n))]
+    
+    df = pd.DataFrame({
+        "Пол, возраст": age_str,
+        "ЗП": salary_str,
+        "Ищет работу на должность:": rng.choice(TITLES, n),
+        "Город": city_str,
+        "Занятость": "полная занятость",
+        "График": "полный день",
+        "Опыт (двойное нажатие для полной версии)": experience,
+        "Последенее/нынешнее место работы": "ООО «Компания»",
+        "Последеняя/нынешняя должность": "Специалист",
+        "Образование и ВУЗ": "Высшее образование 2010",
+        "Обновление резюме": "01.01.2024 12:00",
+        "Авто": "Не указано",
+    })
+    
+    # Пропуски, как в реальной выгрузке
+    for column, share in [("Пол, возраст", 0.01), ("ЗП", 0.02), ("Опыт (двойное нажатие для полной версии)", 0.03)]:
+        df.loc[rng.random(n) < share, column] = np.nan
+    return df
+
+
+def main() -> None:
+    if len(sys.argv) != 3:
+        print("Использование: python synthetic.py ЧИСЛО_СТРОК путь/к/output.csv", file=sys.stderr)
+        sys.exit(1)
+    make_resumes(int(sys.argv[1])).to_csv(sys.argv[2])
+
+
+if __name__ == "__main__":
+    main()